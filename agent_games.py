@@ -0,0 +1,185 @@
+"""
+Offline baseline for the multi-agent Clue experiments in concordia.ipynb.
+
+The LLM agents are replaced by a deterministic agent that passes on the statements it knows and
+deduces exactly. A puzzle's statements from v1.py are dealt out among the agents, the agents talk
+in the order generate_conversation_order gives for an agent_matrix, and each game records the turn
+at which each agent could first name the murderer, room and weapon. Thousands of seeded games per
+topology run in a few seconds and are fully reproducible.
+
+    python agent_games.py --games 1000             # every topology in TOPOLOGIES
+    python agent_games.py --topology chain --json  # one JSON line per game
+"""
+import argparse
+import json
+import statistics
+
+import v1
+from conversations import generate_conversation_order
+
+# Statements generated per puzzle (before deduplication). With many more, an agent can usually
+# solve the case from the statements it was dealt, before anyone talks.
+DEFAULT_STATEMENTS = 12
+
+# agent_matrix[i][j] == 1 means agent i starts a conversation with agent j
+TOPOLOGIES = {
+    'chain': [          # A-B and B-C, as in concordia.ipynb
+        [0, 1, 0],
+        [0, 0, 1],
+        [0, 0, 0],
+    ],
+    'star': [           # A talks to B and to C, who never talk to each other
+        [0, 1, 1],
+        [0, 0, 0],
+        [0, 0, 0],
+    ],
+    'ring': [           # A-B, B-C and C-A
+        [0, 1, 0],
+        [0, 0, 1],
+        [1, 0, 0],
+    ],
+    'complete': [       # every pair, once
+        [0, 1, 1],
+        [0, 0, 1],
+        [0, 0, 0],
+    ],
+}
+
+class DeductionAgent:
+    """
+    Stand-in for an LLM agent: it knows some statements, tells them to whoever it talks to, and
+    deduces exactly with can_determine_truth_values.
+
+    With relay, it also passes on statements it heard from others; without, only the ones it was
+    dealt, so a clue travels one hop at most.
+    """
+
+    def __init__(self, name, statements, relay=True):
+        self.name = name
+        self.own_statements = list(statements)
+        self.statements = list(statements)
+        self.relay = relay
+        self._known = set(self.statements)
+
+    def message(self):
+        """The statements this agent tells the agent it is talking to."""
+        return self.statements if self.relay else self.own_statements
+
+    def hear(self, statements):
+        """Learn the statements this agent didn't know yet; returns whether there were any."""
+        new_statements = [expr for expr in statements if expr not in self._known]
+        self._known.update(new_statements)
+        self.statements.extend(new_statements)
+        return bool(new_statements)
+
+    def solution(self):
+        """The assignment this agent's statements pin down, or None if they don't yet."""
+        success, remaining = v1.can_determine_truth_values(self.statements, v1.possible_assignments)
+        return remaining[0] if success else None
+
+def play_agent_game(puzzle, agent_matrix, iterations=4, relay=True):
+    """
+    Deal the puzzle's statements round-robin (in reveal order) to one agent per row of
+    agent_matrix, then let them talk in conversation order.
+
+    Returns the turn at which each agent first knew the solution (0 if its own statements were
+    enough, None if it never did), and the turns until the first and until every agent knew it.
+    """
+    num_agents = len(agent_matrix)
+    agents = [DeductionAgent(chr(ord('A') + i), puzzle['reveal_order'][i::num_agents], relay)
+              for i in range(num_agents)]
+    solved_turns = [0 if agent.solution() is not None else None for agent in agents]
+
+    conversation_order = generate_conversation_order(agent_matrix, iterations)
+    for turn, (agent_from, agent_to, _) in enumerate(conversation_order, 1):
+        if None not in solved_turns:
+            break
+        speaker = agents[ord(agent_from) - ord('A')]
+        listener_index = ord(agent_to) - ord('A')
+        if agents[listener_index].hear(speaker.message()) and solved_turns[listener_index] is None:
+            if agents[listener_index].solution() is not None:
+                solved_turns[listener_index] = turn
+
+    solved = [turn for turn in solved_turns if turn is not None]
+    return {
+        'turns': len(conversation_order),
+        'solved_turns': solved_turns,
+        'first_solved': min(solved) if solved else None,
+        'all_solved': max(solved) if len(solved) == num_agents else None,
+    }
+
+def agent_game(seed, topologies=TOPOLOGIES, iterations=4, relay=True, num_statements=DEFAULT_STATEMENTS,
+               max_propositions=4):
+    """Play one seeded puzzle on every topology; a run_in_pool job."""
+    puzzle = v1.generate_puzzle(seed, num_statements, max_propositions)
+    solvable, _ = v1.can_determine_truth_values(puzzle['statements'], v1.possible_assignments)
+    return {
+        'seed': seed,
+        'num_statements': len(puzzle['statements']),
+        'solvable': solvable,
+        'topologies': {name: play_agent_game(puzzle, agent_matrix, iterations, relay)
+                       for name, agent_matrix in topologies.items()},
+    }
+
+def run_agent_games(seeds, topologies=TOPOLOGIES, max_workers=None, chunk_size=64, **options):
+    """Play agent_game for every seed across a process pool, yielding results in completion order."""
+    return v1.run_in_pool(agent_game, seeds, max_workers, chunk_size, topologies=topologies, **options)
+
+def summarize(games, topologies):
+    """Per topology: how often agents solved the case and how many turns it took."""
+    summary = {}
+    for name in topologies:
+        results = [game['topologies'][name] for game in games if game['solvable']]
+        first = [result['first_solved'] for result in results if result['first_solved'] is not None]
+        every = [result['all_solved'] for result in results if result['all_solved'] is not None]
+        summary[name] = {
+            'games': len(results),
+            'first_solved_rate': len(first) / len(results) if results else 0.0,
+            'all_solved_rate': len(every) / len(results) if results else 0.0,
+            'mean_first_solved': statistics.mean(first) if first else None,
+            'median_first_solved': statistics.median(first) if first else None,
+            'mean_all_solved': statistics.mean(every) if every else None,
+        }
+    return summary
+
+def print_summary(summary, unsolvable):
+    print(f"{'topology':<12} {'games':>6} {'first solved':>13} {'mean turn':>10} {'median':>7} "
+          f"{'all solved':>11} {'mean turn':>10}")
+    for name, row in summary.items():
+        mean_first = '-' if row['mean_first_solved'] is None else f"{row['mean_first_solved']:.2f}"
+        median_first = '-' if row['median_first_solved'] is None else f"{row['median_first_solved']:g}"
+        mean_all = '-' if row['mean_all_solved'] is None else f"{row['mean_all_solved']:.2f}"
+        print(f"{name:<12} {row['games']:>6} {row['first_solved_rate']:>12.1%} {mean_first:>10} {median_first:>7} "
+              f"{row['all_solved_rate']:>10.1%} {mean_all:>10}")
+    if unsolvable:
+        print(f"\n{unsolvable} puzzle(s) left out: even all their statements together don't solve the case")
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated-agent Clue games over conversation topologies")
+    parser.add_argument('--games', type=int, default=1000, help="seeded games per topology")
+    parser.add_argument('--seed', type=int, default=0, help="first seed")
+    parser.add_argument('--topology', action='append', choices=sorted(TOPOLOGIES), default=None,
+                        help="topology to play (repeatable; all of them by default)")
+    parser.add_argument('--iterations', type=int, default=4, help="conversation iterations, as in the notebook")
+    parser.add_argument('--statements', type=int, default=DEFAULT_STATEMENTS, help="number of statements to generate")
+    parser.add_argument('--max-propositions', type=int, default=4, help="maximum propositions per statement")
+    parser.add_argument('--no-relay', action='store_true', help="agents only pass on the statements they were dealt")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--json', action='store_true', help="print one JSON line per game instead of a summary")
+    args = parser.parse_args()
+
+    topologies = {name: TOPOLOGIES[name] for name in (args.topology or TOPOLOGIES)}
+    seeds = range(args.seed, args.seed + args.games)
+    games = []
+    for game in run_agent_games(seeds, topologies, args.workers, iterations=args.iterations,
+                                relay=not args.no_relay, num_statements=args.statements,
+                                max_propositions=args.max_propositions):
+        if args.json:
+            print(json.dumps(game))
+        else:
+            games.append(game)
+    if not args.json:
+        print_summary(summarize(games, topologies), sum(not game['solvable'] for game in games))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmarks for the hot paths in v1.py: clue generation, deduplication, evaluation and the
+reveal loop, on several board sizes and with fixed seeds.
+
+    python benchmark.py                  # run and compare against benchmark_baseline.json
+    python benchmark.py --save-baseline  # run and store the results as the new baseline
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+import v1
+
+# (suspects, rooms, weapons) for each board the benchmarks run on
+BOARD_SIZES = [(3, 3, 3), (6, 9, 6)]
+# Clue counts for the full reveal-loop games, each played with GAME_SEEDS
+GAME_CLUE_COUNTS = [10, 25, 50]
+GAME_SEEDS = range(20)
+
+BASELINE_PATH = 'benchmark_baseline.json'
+# Per-op time above baseline * REGRESSION_THRESHOLD is reported as a regression
+REGRESSION_THRESHOLD = 1.25
+
+def random_expressions(count, seed=0, max_propositions=4):
+    """Clues for random solutions of the current board, reproducible from the seed."""
+    rng = random.Random(seed)
+    expressions = []
+    for _ in range(count):
+        actual_assignment = rng.choice(v1.possible_assignments)
+        expressions.append(v1.generate_random_expression(v1.variables, actual_assignment, max_propositions, rng=rng))
+    return expressions
+
+def clear_caches(expressions=()):
+    """
+    Drop the per-board caches so every run starts cold, along with the text each of the given
+    expressions (and their subexpressions) renders once.
+    """
+    v1.symbol_masks.clear()
+    v1.statement_masks.clear()
+    v1.natural_language_cache.clear()
+    for node in expressions:
+        object.__setattr__(node, '_text', None)
+
+def subexpressions(expressions):
+    """Every distinct node in the given expressions, for clear_caches."""
+    nodes = set()
+    stack = list(expressions)
+    while stack:
+        node = stack.pop()
+        if node not in nodes:
+            nodes.add(node)
+            stack.extend(node.args)
+    return nodes
+
+def bench_generate(count=2000):
+    rng = random.Random(1)
+    actual_assignment = rng.choice(v1.possible_assignments)
+    def run():
+        for _ in range(count):
+            v1.generate_random_expression(v1.variables, actual_assignment, 4, rng=rng)
+        return count
+    return run
+
+def bench_dedupe(dedupe, count=2000):
+    rng = random.Random(2)
+    actual_assignment = rng.choice(v1.possible_assignments)
+    candidates = [v1.generate_random_expression(v1.variables, actual_assignment, 4, rng=rng) for _ in range(count)]
+    nodes = subexpressions(candidates)
+    def run():
+        clear_caches(nodes)
+        v1.dedupe_statements(candidates, dedupe)
+        return count
+    return run
+
+def bench_evaluate(count=200, assignments=27):
+    expressions = random_expressions(count, seed=3)
+    rng = random.Random(3)
+    sample = [v1.possible_assignments[rng.randrange(len(v1.possible_assignments))] for _ in range(assignments)]
+    def run():
+        for expr in expressions:
+            for assignment in sample:
+                v1.evaluate_expression(expr, assignment)
+        return count * assignments
+    return run
+
+def bench_determine(backend, count=500):
+    puzzle = v1.generate_puzzle(4, num_statements=50)
+    rng = random.Random(4)
+    subsets = [rng.sample(puzzle['statements'], rng.randint(1, min(8, len(puzzle['statements']))))
+               for _ in range(count)]
+    def run():
+        clear_caches()
+        for subset in subsets:
+            v1.can_determine_truth_values(subset, v1.possible_assignments, backend)
+        return count
+    return run
+
+def bench_game(num_statements):
+    puzzles = [v1.generate_puzzle(seed, num_statements) for seed in GAME_SEEDS]
+    def run():
+        clear_caches()
+        for puzzle in puzzles:
+            v1.solve_puzzle(puzzle)
+        return len(puzzles)
+    return run
+
+def benchmarks():
+    """Yield (name, run) pairs for the current board; run() returns how many ops it did."""
+    yield 'generate_random_expression', bench_generate()
+    for dedupe in sorted(v1.dedupe_keys):
+        yield f'dedupe[{dedupe}]', bench_dedupe(dedupe)
+    yield 'evaluate_expression', bench_evaluate()
+    for backend in v1.solver_backends:
+        yield f'can_determine_truth_values[{backend}]', bench_determine(backend)
+    for num_statements in GAME_CLUE_COUNTS:
+        yield f'game[{num_statements} clues]', bench_game(num_statements)
+
+def measure(run, repeat):
+    """Best per-op time in microseconds over `repeat` runs, and peak traced memory in KB."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = run()
+        best = min(best, (time.perf_counter() - start) / ops)
+
+    # Memory is measured on a separate run, since tracing slows everything down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'per_op_us': best * 1e6, 'peak_kb': peak / 1024}
+
+def run_benchmarks(repeat=3, only=None):
+    results = {}
+    for board in BOARD_SIZES:
+        v1.configure_board(*board)
+        board_name = 'x'.join(map(str, board))
+        for name, run in benchmarks():
+            full_name = f'{board_name}/{name}'
+            if only and only not in full_name:
+                continue
+            results[full_name] = measure(run, repeat)
+            yield full_name, results[full_name]
+    v1.configure_board()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths in v1.py")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per benchmark (the best one counts)")
+    parser.add_argument('--only', default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline file to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    args = parser.parse_args()
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        baseline = {}
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<48} {'per op (us)':>12} {'peak (KB)':>10} {'vs baseline':>12}")
+    for name, result in run_benchmarks(args.repeat, args.only):
+        results[name] = result
+        comparison = ''
+        if name in baseline:
+            ratio = result['per_op_us'] / baseline[name]['per_op_us']
+            comparison = f"{ratio:.2f}x"
+            if ratio > REGRESSION_THRESHOLD:
+                comparison += ' !'
+                regressions.append(name)
+        print(f"{name:<48} {result['per_op_us']:>12.2f} {result['peak_kb']:>10.1f} {comparison:>12}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nSaved baseline to '{args.baseline}'")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {REGRESSION_THRESHOLD}x baseline:")
+        for name in regressions:
+            print(f"  {name}")
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+On-disk cache for chat completions, keyed by a hash of the model, messages and parameters.
+
+Wrap a chat client with CachedChatClient and identical requests are answered from a local
+append-only JSON-lines file instead of the API, so re-running a notebook experiment only pays
+for the calls that changed.
+"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class CacheMiss(KeyError):
+    """Raised in replay-only mode when a request isn't in the cache."""
+
+def load_jsonl(path):
+    """
+    The intact records of an append-only JSON-lines file, as (record, line size in bytes) pairs.
+
+    Reading stops at the first line that doesn't parse or isn't terminated, i.e. one torn by a
+    crash mid-write, and the file is cut back to just before it so the next append starts on a
+    line of its own. A missing file has no records.
+    """
+    records = []
+    if not os.path.exists(path):
+        return records
+    valid_size = 0
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            valid_size += len(line)
+            records.append((record, len(line)))
+    if valid_size < os.path.getsize(path):
+        os.truncate(path, valid_size)
+    return records
+
+def is_async_client(client, asynchronous=None):
+    """
+    Whether client.chat.completions.create has to be awaited. An explicit `asynchronous` decides;
+    otherwise it is guessed from a coroutine function or a client class named like AsyncOpenAI
+    (which wraps its coroutine functions in plain ones).
+    """
+    if asynchronous is not None:
+        return asynchronous
+    return inspect.iscoroutinefunction(client.chat.completions.create) or "Async" in type(client).__name__
+
+def request_key(model, messages, params):
+    """Stable hash of a request; dict key order and whitespace don't matter."""
+    payload = json.dumps({"model": model, "messages": messages, "params": params},
+                         sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CompletionCache:
+    """
+    Append-only JSON-lines store of responses, indexed in memory.
+
+    Each line is one {"key": ..., "response": ...} record. When the file grows past max_bytes it
+    is rewritten with only the most recently used entries, down to three quarters of the limit.
+    Safe to share between clients and threads in one process.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> (response, record size in bytes), least recently used first
+        self._entries = {}
+        self._size = 0
+        self._load()
+
+    def _load(self):
+        for record, record_size in load_jsonl(self.path):
+            self._entries.pop(record["key"], None)
+            self._entries[record["key"]] = (record["response"], record_size)
+            self._size += record_size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """The cached response for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, response):
+        line = (json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self._entries.pop(key, None)
+            self._entries[key] = (response, len(line))
+            self._size += len(line)
+            if self._size > self.max_bytes:
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the file with the most recently used entries that fit in 3/4 of max_bytes."""
+        budget = self.max_bytes * 3 // 4
+        kept = []
+        size = 0
+        for key, (response, record_size) in reversed(self._entries.items()):
+            if size + record_size > budget:
+                break
+            kept.append((key, response, record_size))
+            size += record_size
+        kept.reverse()
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for key, response, _ in kept:
+                f.write((json.dumps({"key": key, "response": response}, ensure_ascii=False) + "\n").encode("utf-8"))
+        os.replace(tmp_path, self.path)
+        self._entries = {key: (response, record_size) for key, response, record_size in kept}
+        self._size = size
+
+def _response_to_record(chat_completion):
+    """The parts of a chat completion the experiments use, as plain JSON data."""
+    choices = []
+    for choice in chat_completion.choices:
+        choices.append({
+            "role": getattr(choice.message, "role", "assistant"),
+            "content": choice.message.content,
+            "finish_reason": getattr(choice, "finish_reason", None),
+        })
+    return {"model": getattr(chat_completion, "model", None), "choices": choices}
+
+def _record_to_response(record):
+    """Rebuild a completion-like object (response.choices[0].message.content) from a record."""
+    choices = [
+        SimpleNamespace(message=SimpleNamespace(role=choice["role"], content=choice["content"]),
+                        finish_reason=choice["finish_reason"])
+        for choice in record["choices"]
+    ]
+    return SimpleNamespace(model=record["model"], choices=choices, cached=True)
+
+class CachedChatClient:
+    """
+    Wraps a chat client so client.chat.completions.create(...) is served from a CompletionCache.
+
+    Works with blocking clients (OpenAI) and async ones (AsyncOpenAI), detected by
+    is_async_client unless `asynchronous` is given. In replay_only mode a miss raises CacheMiss instead of
+    calling the API.
+    """
+
+    def __init__(self, client, cache, replay_only=False, asynchronous=None):
+        self.client = client
+        self.cache = cache if isinstance(cache, CompletionCache) else CompletionCache(cache)
+        self.replay_only = replay_only
+        asynchronous = is_async_client(client, asynchronous)
+        self.asynchronous = asynchronous
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self._create_async if asynchronous else self._create))
+
+    def _lookup(self, messages, model, params):
+        key = request_key(model, messages, params)
+        record = self.cache.get(key)
+        if record is None and self.replay_only:
+            raise CacheMiss(key)
+        return key, record
+
+    def _create(self, messages, model, **params):
+        key, record = self._lookup(messages, model, params)
+        if record is not None:
+            return _record_to_response(record)
+        chat_completion = self.client.chat.completions.create(messages=messages, model=model, **params)
+        self.cache.put(key, _response_to_record(chat_completion))
+        return chat_completion
+
+    async def _create_async(self, messages, model, **params):
+        key, record = self._lookup(messages, model, params)
+        if record is not None:
+            return _record_to_response(record)
+        chat_completion = await self.client.chat.completions.create(messages=messages, model=model, **params)
+        self.cache.put(key, _response_to_record(chat_completion))
+        return chat_completion
@@ -0,0 +1,434 @@
+"""
+Multi-agent conversation helpers for the Clue experiments in concordia.ipynb.
+
+Agents are named by letter ('A', 'B', ...). A discourse is a list with one message history per
+agent, and a conversation order is a list of (agent_from, agent_to, instruction) turns.
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import v1
+from completion_cache import is_async_client, load_jsonl
+
+MODEL = "gpt-4o"
+
+def generate_conversations(client, initial_discourse, conversation_order, model=MODEL, log=None):
+    # Copy each agent's history so the caller's initial_discourse is left as it was
+    discourse = [messages.copy() for messages in initial_discourse]
+    # With a turn log (a TurnLog or a path), turns it already holds are replayed instead of re-run
+    turn_log, owned = None, False
+    try:
+        turn_log, owned = _open_turn_log(log)
+        completed = _resume(turn_log, discourse, conversation_order, model) if turn_log else set()
+
+        for turn, conversation in enumerate(conversation_order):
+            if turn in completed:
+                continue
+            agent_from, agent_to, instruction = conversation
+            agent_from_index = ord(agent_from) - ord('A')
+            agent_to_index = ord(agent_to) - ord('A')
+
+            chat_completion = client.chat.completions.create(
+                messages = _prompt(discourse[agent_from_index]) + [{"role": "system", "content": instruction}],
+                model = model,
+            )
+            response = chat_completion.choices[0].message.content
+            _record_turn(discourse, agent_from_index, agent_to_index, response)
+            if turn_log:
+                turn_log.append(turn, conversation, response)
+    finally:
+        _close_turn_log(turn_log, owned)
+
+    return discourse
+
+def _prompt(messages):
+    """What an agent's history sends to the model: the bounded prompt of an AgentContext, or all of a plain list."""
+    if isinstance(messages, AgentContext):
+        return messages.prompt()
+    return list(messages)
+
+def _record_turn(discourse, agent_from_index, agent_to_index, response):
+    """Add a turn's response to both agents' histories; an AgentContext listener also hears the speaker's clues."""
+    message = {"role": "system", "content": response}
+    speaker = discourse[agent_from_index]
+    listener = discourse[agent_to_index]
+    speaker.append(message)
+    listener.append(message)
+    if isinstance(speaker, AgentContext) and isinstance(listener, AgentContext):
+        listener.hear(speaker.clues)
+
+def print_discourse(agent, discourse):
+    agent_index = ord(agent) - ord('A')
+    print(discourse[agent_index][0]["content"])
+    for i in range(1, len(discourse[agent_index])):
+        print(discourse[agent_index][i]["content"])
+    print("\n")
+
+def generate_conversation_order(agent_matrix, iterations):
+    num_agents = len(agent_matrix)
+    conversation_order = []
+
+    # Initialize the start of the conversation
+    for i in range(num_agents):
+        for j in range(num_agents):
+            if agent_matrix[i][j] == 1:
+                agent_from = chr(ord('A') + i)
+                agent_to = chr(ord('A') + j)
+                instruction = f"Start the conversation with agent {agent_to}."
+                conversation_order.append((agent_from, agent_to, instruction))
+
+    # Generate the rest of the conversation order
+    for _ in range(iterations - 1):
+        for i in range(num_agents):
+            for j in range(num_agents):
+                if agent_matrix[i][j] == 1:
+                    agent_from = chr(ord('A') + i)
+                    agent_to = chr(ord('A') + j)
+                    instruction = f"Reply to agent {agent_from}."
+                    conversation_order.append((agent_to, agent_from, instruction))
+                    instruction = f"Reply to agent {agent_to}."
+                    conversation_order.append((agent_from, agent_to, instruction))
+
+    return conversation_order
+
+class AgentContext:
+    """
+    One agent's side of the discourse, with a bounded prompt.
+
+    It keeps the full history like a plain message list (so it can stand in for one in a
+    discourse), but prompt(), which is what the conversation engines send to the model, only
+    uses the system prompt, the agent's clues with what they leave possible, and the last
+    `window` turns. That keeps the cost of each turn roughly flat however long the conversation.
+    When one AgentContext talks to another, the listener hears the speaker's clues.
+    """
+
+    def __init__(self, system_message, clues=(), window=8):
+        self.history = [system_message]
+        self.clues = []
+        self.window = window
+        self._constraints = None
+        self.hear(clues)
+
+    def hear(self, clues):
+        """Add clues (v1 boolean statements) to what the agent knows, skipping ones it already has."""
+        known = {v1.canonical_form(clue) for clue in self.clues}
+        for clue in clues:
+            key = v1.canonical_form(clue)
+            if key not in known:
+                known.add(key)
+                self.clues.append(clue)
+                self._constraints = None
+
+    def known_constraints(self):
+        """
+        A short system message with the agent's clues and what they leave possible in each
+        category, or None when it has no clues.
+        """
+        if not self.clues:
+            return None
+        if self._constraints is None:
+            consistent = v1.all_assignments_mask
+            for clue in self.clues:
+                consistent &= v1.statement_mask(clue)
+            lines = ["Clues you know:"]
+            lines.extend(f"- {v1.statement_text(clue).rstrip(',')}" for clue in self.clues)
+            lines.append("What they leave possible:")
+            for category in v1.categories:
+                possible = [name for var, name in category['names'].items()
+                            if consistent & v1.statement_mask(v1.variables[var])]
+                if len(possible) == 1:
+                    lines.append(f"- {category['title']}: {possible[0]} (certain)")
+                elif len(possible) == len(category['names']):
+                    lines.append(f"- {category['title']}: unknown")
+                else:
+                    lines.append(f"- {category['title']}: one of {', '.join(possible)}")
+            self._constraints = {"role": "system", "content": "\n".join(lines)}
+        return self._constraints
+
+    def prompt(self):
+        """The messages sent to the model for this agent's next turn."""
+        messages = [self.history[0]]
+        constraints = self.known_constraints()
+        if constraints is not None:
+            messages.append(constraints)
+        turns = self.history[1:]
+        if self.window is not None:
+            turns = turns[-self.window:] if self.window else []
+        return messages + turns
+
+    def append(self, message):
+        self.history.append(message)
+
+    def copy(self):
+        """An independent copy; appending to or telling clues to one doesn't affect the other."""
+        context = AgentContext(self.history[0], window=self.window)
+        context.history = list(self.history)
+        context.clues = list(self.clues)
+        context._constraints = self._constraints
+        return context
+
+    def __len__(self):
+        return len(self.history)
+
+    def __getitem__(self, index):
+        return self.history[index]
+
+    def __iter__(self):
+        return iter(self.history)
+
+def make_contexts(initial_discourse, clues=None, window=8):
+    """
+    Turn a discourse (one message list per agent, system prompt first) into AgentContexts.
+    clues, if given, holds each agent's v1 statements in the same order as the agents.
+    """
+    contexts = []
+    for i, messages in enumerate(initial_discourse):
+        context = AgentContext(messages[0], clues[i] if clues else (), window)
+        for message in messages[1:]:
+            context.append(message)
+        contexts.append(context)
+    return contexts
+
+class TurnLog:
+    """
+    Append-only JSON-lines log of completed conversation turns, for resuming interrupted runs.
+
+    The first line identifies the run (model and a hash of the initial discourse); every other
+    line is one turn: its index in the conversation order, the two agents, the instruction and
+    the response. Each turn is flushed as soon as it is written, so a crash or an API error loses
+    nothing; fsync (which protects against power loss) is only done every sync_every turns.
+    """
+
+    def __init__(self, path, sync_every=8):
+        self.path = path
+        self.sync_every = sync_every
+        self.header = None
+        # turn index -> record, for every turn already in the log
+        self.turns = {}
+        self._unsynced = 0
+        for record, _ in load_jsonl(path):
+            if self.header is None:
+                self.header = record
+            else:
+                self.turns[record["turn"]] = record
+        self._file = open(path, "ab")
+
+    def start(self, model, initial_discourse):
+        """Write the run's header, or check that an existing log belongs to the same run."""
+        header = {"model": model, "initial_discourse": discourse_hash(initial_discourse)}
+        if self.header is None:
+            self.header = header
+            self._write(header)
+            self.sync()
+        elif self.header != header:
+            raise ValueError(f"'{self.path}' is the log of a different run")
+
+    def append(self, turn, conversation, response):
+        agent_from, agent_to, instruction = conversation
+        record = {"turn": turn, "agent_from": agent_from, "agent_to": agent_to,
+                  "instruction": instruction, "response": response}
+        self.turns[turn] = record
+        self._write(record)
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def _write(self, record):
+        self._file.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+        self._file.flush()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def discourse_hash(discourse):
+    """Stable hash of a discourse's messages (AgentContexts count as their full history)."""
+    payload = json.dumps([list(messages) for messages in discourse], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _open_turn_log(log):
+    """A TurnLog for `log` (a TurnLog, a path or None), and whether the caller should close it."""
+    if log is None or isinstance(log, TurnLog):
+        return log, False
+    return TurnLog(log), True
+
+def _close_turn_log(turn_log, owned):
+    if turn_log is None:
+        return
+    if owned:
+        turn_log.close()
+    else:
+        turn_log.sync()
+
+def _resume(turn_log, discourse, conversation_order, model):
+    """
+    Replay the turns already in the log into the discourse, in conversation order, and return
+    their indices. A turn only runs after the earlier turns of both its agents, so replaying the
+    logged turns in order rebuilds every agent's history exactly.
+    """
+    turn_log.start(model, discourse)
+    for turn in sorted(turn_log.turns):
+        record = turn_log.turns[turn]
+        if turn >= len(conversation_order) or \
+                (record["agent_from"], record["agent_to"], record["instruction"]) != tuple(conversation_order[turn]):
+            raise ValueError(f"turn {turn} in '{turn_log.path}' doesn't match the conversation order")
+        _record_turn(discourse, ord(record["agent_from"]) - ord('A'), ord(record["agent_to"]) - ord('A'),
+                     record["response"])
+    return set(turn_log.turns)
+
+def iter_turns(path):
+    """Stream the turn records of a log, in the order they completed, without loading it all."""
+    with open(path, "rb") as f:
+        header = True
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            if header:
+                header = False
+                continue
+            yield record
+
+def print_discourse_from_log(agent, initial_discourse, path):
+    """print_discourse for a run's turn log, streamed from disk rather than rebuilt in memory."""
+    agent_index = ord(agent) - ord('A')
+    for message in initial_discourse[agent_index]:
+        print(message["content"])
+    for record in iter_turns(path):
+        if agent in (record["agent_from"], record["agent_to"]):
+            print(record["response"])
+    print("\n")
+
+def turn_dependencies(conversation_order):
+    """
+    For each turn, the earlier turns it has to wait for.
+
+    A turn reads its speaker's history and appends to both participants' histories, so it has to
+    come after the previous turn involving either of them. Turns between disjoint pairs of agents
+    don't depend on each other.
+    """
+    last_turn = {}
+    dependencies = []
+    for i, (agent_from, agent_to, _) in enumerate(conversation_order):
+        dependencies.append(sorted({last_turn[agent] for agent in (agent_from, agent_to) if agent in last_turn}))
+        last_turn[agent_from] = last_turn[agent_to] = i
+    return dependencies
+
+async def _create_completion(client, messages, model, asynchronous):
+    """Call the chat client, off the event loop if it is a blocking one."""
+    create = client.chat.completions.create
+    if asynchronous:
+        return await create(messages=messages, model=model)
+    result = await asyncio.to_thread(create, messages=messages, model=model)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+async def generate_conversations_async(client, initial_discourse, conversation_order, max_concurrency=4,
+                                       model=MODEL, log=None, asynchronous=None):
+    """
+    Same result as generate_conversations, but turns that don't depend on each other (see
+    turn_dependencies) run concurrently, at most max_concurrency calls at a time.
+
+    Every agent still sees its messages in conversation_order, so with a deterministic client the
+    discourse is identical to a sequential run. Works with both async clients (e.g. AsyncOpenAI)
+    and blocking ones, which are run in worker threads; `asynchronous` says which the client is
+    when is_async_client can't tell. initial_discourse is not modified.
+    With a turn log, turns it already holds are replayed instead of re-run, as in generate_conversations.
+    """
+    discourse = [messages.copy() for messages in initial_discourse]
+    dependencies = turn_dependencies(conversation_order)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    asynchronous = is_async_client(client, asynchronous)
+    turns = []
+    turn_log, owned = None, False
+    completed = set()
+
+    async def run_turn(i):
+        if i in completed:
+            return
+        if dependencies[i]:
+            await asyncio.gather(*(turns[j] for j in dependencies[i]))
+        agent_from, agent_to, instruction = conversation_order[i]
+        agent_from_index = ord(agent_from) - ord('A')
+        agent_to_index = ord(agent_to) - ord('A')
+
+        messages = _prompt(discourse[agent_from_index]) + [{"role": "system", "content": instruction}]
+        async with semaphore:
+            chat_completion = await _create_completion(client, messages, model, asynchronous)
+        response = chat_completion.choices[0].message.content
+        _record_turn(discourse, agent_from_index, agent_to_index, response)
+        if turn_log:
+            turn_log.append(i, conversation_order[i], response)
+
+    try:
+        turn_log, owned = _open_turn_log(log)
+        if turn_log:
+            completed = _resume(turn_log, discourse, conversation_order, model)
+        for i in range(len(conversation_order)):
+            turns.append(asyncio.ensure_future(run_turn(i)))
+        await asyncio.gather(*turns)
+    except BaseException:
+        # Stop the other turns before the log is closed; the ones that finished are kept
+        for task in turns:
+            task.cancel()
+        await asyncio.gather(*turns, return_exceptions=True)
+        raise
+    finally:
+        _close_turn_log(turn_log, owned)
+    return discourse
+
+def run_conversations(client, initial_discourse, conversation_order, max_concurrency=4, model=MODEL, log=None,
+                      asynchronous=None):
+    """Blocking wrapper around generate_conversations_async for scripts (use `await` in notebooks)."""
+    return asyncio.run(generate_conversations_async(client, initial_discourse, conversation_order,
+                                                    max_concurrency, model, log, asynchronous))
+
+def echo_reply(messages):
+    """Default StubChatClient reply: deterministic in the history it was sent."""
+    return f"[reply to {len(messages)} messages] {messages[-1]['content']}"
+
+class StubChatClient:
+    """
+    Offline stand-in for an OpenAI chat client with a fixed latency per call.
+
+    Exposes the same client.chat.completions.create(messages=..., model=...) call, as a coroutine
+    by default or as a blocking call with blocking=True. Every call is recorded in `calls`.
+    """
+
+    def __init__(self, latency=0.0, reply=echo_reply, blocking=False):
+        self.latency = latency
+        self.reply = reply
+        self.calls = []
+        create = self._create_blocking if blocking else self._create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    def _completion(self, messages, model):
+        self.calls.append({"messages": messages, "model": model})
+        content = self.reply(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _create(self, messages, model, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._completion(messages, model)
+
+    def _create_blocking(self, messages, model, **kwargs):
+        time.sleep(self.latency)
+        return self._completion(messages, model)
@@ -0,0 +1,36 @@
+"""The solver backends must agree on every statement set, on both board sizes."""
+import random
+
+import pytest
+
+import v1
+
+@pytest.fixture(params=[(3, 3, 3), (6, 9, 6)], ids=lambda board: 'x'.join(map(str, board)))
+def board(request):
+    v1.configure_board(*request.param)
+    yield request.param
+    v1.configure_board()
+
+def statement_sets(count, seed=0):
+    """Random subsets of seeded puzzles' statements, from empty up to the whole puzzle."""
+    rng = random.Random(seed)
+    sets = []
+    for puzzle_seed in range(count // 20):
+        statements = v1.generate_puzzle(puzzle_seed, num_statements=30)['statements']
+        for _ in range(20):
+            sets.append(rng.sample(statements, rng.randint(0, len(statements))))
+    return sets
+
+def test_backends_agree(board):
+    sets = statement_sets(1000)
+    assert v1.cross_check_backends(sets, v1.possible_assignments) == []
+    # The sets cover both verdicts, so agreement isn't trivial
+    verdicts = {v1.can_determine_truth_values(statements, v1.possible_assignments)[0] for statements in sets}
+    assert verdicts == {True, False}
+
+def test_backends_agree_on_contradictions(board):
+    a1 = v1.variables['A1']
+    sets = [[a1, v1.NOT(a1)], [v1.AND(a1, v1.NOT(a1))]]
+    assert v1.cross_check_backends(sets, v1.possible_assignments) == []
+    for backend in v1.solver_backends:
+        assert v1.can_determine_truth_values(sets[0], v1.possible_assignments, backend) == (False, [])
@@ -0,0 +1,45 @@
+"""The concurrent conversation scheduler, against the offline StubChatClient."""
+import time
+
+from conversations import (StubChatClient, generate_conversation_order, generate_conversations,
+                           run_conversations)
+
+LATENCY = 0.05
+
+# A talks to B and C talks to D, so the two conversations never wait for each other
+DISJOINT_PAIRS = [
+    [0, 1, 0, 0],
+    [0, 0, 0, 0],
+    [0, 0, 0, 1],
+    [0, 0, 0, 0],
+]
+
+def initial_discourse(agents="ABCD"):
+    return [[{"role": "system", "content": f"You are agent {agent}."}] for agent in agents]
+
+def test_concurrent_run_matches_sequential_run():
+    conversation_order = generate_conversation_order(DISJOINT_PAIRS, 5)
+
+    start = time.perf_counter()
+    sequential = generate_conversations(StubChatClient(LATENCY, blocking=True), initial_discourse(),
+                                        conversation_order)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = run_conversations(StubChatClient(LATENCY), initial_discourse(), conversation_order)
+    concurrent_time = time.perf_counter() - start
+
+    assert concurrent == sequential
+    # Two independent conversations: about half the sequential time
+    assert len(conversation_order) * LATENCY <= sequential_time
+    assert concurrent_time < 0.7 * sequential_time
+
+class AsyncLookingClient(StubChatClient):
+    """A blocking client whose class name would make is_async_client guess wrong."""
+
+def test_explicit_asynchronous_flag():
+    conversation_order = generate_conversation_order(DISJOINT_PAIRS, 2)
+    expected = generate_conversations(StubChatClient(blocking=True), initial_discourse(), conversation_order)
+    discourse = run_conversations(AsyncLookingClient(blocking=True), initial_discourse(), conversation_order,
+                                  asynchronous=False)
+    assert discourse == expected
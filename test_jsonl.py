@@ -0,0 +1,41 @@
+"""Append-only JSON-lines files survive a torn last line: reloading keeps every intact record."""
+import pytest
+
+from completion_cache import CompletionCache
+from conversations import TurnLog
+
+TORN_LINES = [b'{"key": "c", "resp', b'{"turn": 9}']  # cut mid-record; complete but unterminated
+
+@pytest.mark.parametrize("torn", TORN_LINES)
+def test_completion_cache_reload_after_torn_line(tmp_path, torn):
+    path = str(tmp_path / "cache.jsonl")
+    cache = CompletionCache(path)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    with open(path, "ab") as f:
+        f.write(torn)
+
+    cache = CompletionCache(path)
+    assert len(cache) == 2
+    cache.put("d", {"n": 4})
+
+    cache = CompletionCache(path)
+    assert [cache.get(key) for key in "abd"] == [{"n": 1}, {"n": 2}, {"n": 4}]
+
+@pytest.mark.parametrize("torn", TORN_LINES)
+def test_turn_log_reload_after_torn_line(tmp_path, torn):
+    path = str(tmp_path / "turns.jsonl")
+    discourse = [[{"role": "system", "content": "You are agent A."}]]
+    with TurnLog(path) as log:
+        log.start("model", discourse)
+        log.append(0, ("A", "B", "Start."), "hello")
+    with open(path, "ab") as f:
+        f.write(torn)
+
+    with TurnLog(path) as log:
+        assert sorted(log.turns) == [0]
+        log.start("model", discourse)
+        log.append(1, ("B", "A", "Reply."), "hi")
+
+    with TurnLog(path) as log:
+        assert [log.turns[turn]["response"] for turn in sorted(log.turns)] == ["hello", "hi"]
@@ -1,43 +1,144 @@
+import argparse
+import bisect
+import cProfile
+import csv
 import itertools
+import json
+import mmap
+import os
+import pstats
 import random
-import csv
-from boolean import Symbol, AND, OR, NOT
+import sys
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+class Expr:
+    """
+    An immutable boolean expression node.
+
+    `op` is 'VAR', 'NOT', 'AND' or 'OR'. A VAR holds its variable name in `obj`, the others hold
+    their operands in `args`, as in boolean.py. Nodes are hash-consed: build them with Symbol,
+    NOT, AND and OR, which return the existing node for a structure that has been built before,
+    so generating the same clue twice allocates nothing. Each node also carries its proposition
+    count and hash, and renders its text once.
+    """
+
+    __slots__ = ('op', 'obj', 'args', 'propositions', '_hash', '_text')
+
+    def __init__(self, op, obj, args):
+        set_slot = object.__setattr__
+        set_slot(self, 'op', op)
+        set_slot(self, 'obj', obj)
+        set_slot(self, 'args', args)
+        set_slot(self, 'propositions', 1 if op == 'VAR' else sum(arg.propositions for arg in args))
+        set_slot(self, '_hash', hash((op, obj, args)))
+        set_slot(self, '_text', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("expressions are immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Expr) or self._hash != other._hash:
+            return False
+        return self.op == other.op and self.obj == other.obj and self.args == other.args
+
+    def __reduce__(self):
+        # Unpickled nodes (e.g. in run_batch workers) go through the intern table too
+        return _intern, (self.op, self.obj, self.args)
+
+    def is_literal(self):
+        return self.op == 'VAR' or (self.op == 'NOT' and self.args[0].op == 'VAR')
+
+    def __str__(self):
+        """Symbolic text in boolean.py's notation, e.g. ~A1|(B2&C3)."""
+        if self._text is None:
+            if self.op == 'VAR':
+                text = self.obj
+            elif self.op == 'NOT':
+                inner = self.args[0]
+                text = '~' + (str(inner) if inner.op == 'VAR' else f'({inner})')
+            else:
+                # Only literals (a variable or its negation) are left unbracketed
+                operator = '&' if self.op == 'AND' else '|'
+                text = operator.join(str(arg) if arg.is_literal() else f'({arg})' for arg in self.args)
+            object.__setattr__(self, '_text', text)
+        return self._text
+
+    def __repr__(self):
+        return f"Expr({str(self)!r})"
+
+# Every expression node built so far, by (op, obj, args). Cleared along with the other caches
+# (by configure_board, and after each run_in_pool chunk) so it doesn't grow without bound.
+expression_nodes = {}
+
+def _intern(op, obj, args):
+    key = (op, obj, args)
+    node = expression_nodes.get(key)
+    if node is None:
+        node = expression_nodes[key] = Expr(op, obj, args)
+    return node
+
+def Symbol(name):
+    return _intern('VAR', name, ())
+
+def NOT(arg):
+    return _intern('NOT', None, (arg,))
+
+def AND(*args):
+    return _intern('AND', None, args)
+
+def OR(*args):
+    return _intern('OR', None, args)
 
 # Define our own Implies function since it's not available in the boolean module
 def Implies(a, b):
     return OR(NOT(a), b)
 
+def to_boolean(expr):
+    """Convert an expression to boolean.py objects, e.g. to simplify it or use its algebra."""
+    import boolean
+    if expr.op == 'VAR':
+        return boolean.Symbol(expr.obj)
+    args = [to_boolean(arg) for arg in expr.args]
+    return getattr(boolean, expr.op)(*args)
+
+def from_boolean(expr):
+    """Convert a boolean.py expression built from Symbol, NOT, AND and OR into an Expr."""
+    operator = expr.__class__.__name__
+    if operator == 'Symbol':
+        return Symbol(str(expr.obj))
+    args = tuple(from_boolean(arg) for arg in expr.args)
+    if operator == 'NOT':
+        return NOT(*args)
+    elif operator in ('AND', 'OR'):
+        return _intern(operator, None, args)
+    raise ValueError(f"Unsupported expression type: {type(expr)} - {expr}")
+
 # Function to convert boolean expressions to natural language
 def expr_to_natural_language(expr):
     """Convert a boolean expression to natural language format themed around Clue."""
-    if isinstance(expr, Symbol):
-        var_name = str(expr.obj)
-        if var_name.startswith('A'):
-            character = character_names[var_name]
-            return f"the murderer was {character},"
-        elif var_name.startswith('B'):
-            location = location_names[var_name]
-            return f"the murder happened in {location},"
-        elif var_name.startswith('C'):
-            weapon = weapon_names[var_name]
-            return f"{weapon} was the murder weapon,"
-        return str(expr.obj)
+    op = expr.op
+    if op == 'VAR':
+        var_name = expr.obj
+        if var_name in variable_categories:
+            category = variable_categories[var_name]
+            return category['true_text'].format(name=category['names'][var_name]) + ","
+        return expr.obj
     
-    elif expr.__class__.__name__ == 'NOT':
+    elif op == 'NOT':
         # NOT operation
         inner_expr = expr.args[0]
-        var_name = str(inner_expr.obj) if isinstance(inner_expr, Symbol) else None
+        var_name = inner_expr.obj if inner_expr.op == 'VAR' else None
         
-        if isinstance(inner_expr, Symbol):
-            if var_name.startswith('A'):
-                character = character_names[var_name]
-                return f"the murderer was not {character},"
-            elif var_name.startswith('B'):
-                location = location_names[var_name]
-                return f"the murder did not happen in {location},"
-            elif var_name.startswith('C'):
-                weapon = weapon_names[var_name]
-                return f"{weapon} was not the murder weapon,"
+        if var_name in variable_categories:
+            category = variable_categories[var_name]
+            return category['false_text'].format(name=category['names'][var_name]) + ","
         
         # Fall back to general case
         inner_text = expr_to_natural_language(inner_expr)
@@ -46,7 +147,7 @@ def expr_to_natural_language(expr):
             inner_text = inner_text[:-1]
         return f"NOT ({inner_text}),"
     
-    elif expr.__class__.__name__ == 'AND':
+    elif op == 'AND':
         # AND operation
         terms = []
         for arg in expr.args:
@@ -57,7 +158,7 @@ def expr_to_natural_language(expr):
             terms.append(term)
         return f"({' AND '.join(terms)}),"
     
-    elif expr.__class__.__name__ == 'OR':
+    elif op == 'OR':
         # OR operation
         terms = []
         for arg in expr.args:
@@ -69,7 +170,7 @@ def expr_to_natural_language(expr):
         return f"({' OR '.join(terms)}),"
     
     # For our custom Implies function
-    elif isinstance(expr, OR) and len(expr.args) == 2 and isinstance(expr.args[0], NOT):
+    elif op == 'OR' and len(expr.args) == 2 and expr.args[0].op == 'NOT':
         # This is our Implies function: OR(NOT(a), b)
         # Extract the first argument (the antecedent) which is inside the NOT
         antecedent = expr_to_natural_language(expr.args[0].args[0])
@@ -90,124 +191,218 @@ def expr_to_natural_language(expr):
         # For any other type of expression
         return str(expr)
 
-# Initialize all variables
-variables = {
-    # A variables are characters
-    'A1': Symbol('A1'), 'A2': Symbol('A2'), 'A3': Symbol('A3'),
-    # B variables are locations
-    'B1': Symbol('B1'), 'B2': Symbol('B2'), 'B3': Symbol('B3'),
-    # C variables are weapons
-    'C1': Symbol('C1'), 'C2': Symbol('C2'), 'C3': Symbol('C3')
-}
+# Natural-language renderings, cached per statement
+natural_language_cache = {}
 
-# Define the names for better natural language expression
-character_names = {
-    'A1': 'Professor Plum',
-    'A2': 'Colonel Mustard',
-    'A3': 'Mrs. Peacock'
-}
+def statement_text(expr):
+    """expr_to_natural_language, rendered once per statement."""
+    text = natural_language_cache.get(expr)
+    if text is None:
+        text = natural_language_cache[expr] = expr_to_natural_language(expr)
+    return text
 
-location_names = {
-    'B1': 'the Kitchen',
-    'B2': 'the Library',
-    'B3': 'the Conservatory'
-}
+# Board configuration: how many suspects, rooms and weapons are in play.
+# The classic full board is 6 suspects, 9 rooms and 6 weapons.
+NUM_CHARACTERS = 3
+NUM_LOCATIONS = 3
+NUM_WEAPONS = 3
 
-weapon_names = {
-    'C1': 'the Knife',
-    'C2': 'the Revolver',
-    'C3': 'the Candlestick'
-}
+# How can_determine_truth_values counts the assignments left by a set of statements:
+# 'truth_table' ANDs precomputed bitmasks over every assignment (fast for small boards),
+# 'dpll' searches one category at a time and stops at two models (for boards too big to enumerate).
+# Only can_determine_truth_values and is_tautology go through it. The IncrementalSolver behind
+# reveal_rounds, dedupe='models', drop_redundant, plan_puzzle and minimum_clue_sets all work on
+# statement masks, so they enumerate the board whichever backend is selected.
+SOLVER_BACKEND = 'truth_table'
+
+# Names to draw from, in order; boards bigger than these lists get numbered names
+all_character_names = ['Professor Plum', 'Colonel Mustard', 'Mrs. Peacock',
+                       'Miss Scarlett', 'Mrs. White', 'Reverend Green']
+all_location_names = ['the Kitchen', 'the Library', 'the Conservatory', 'the Ballroom',
+                      'the Billiard Room', 'the Dining Room', 'the Lounge', 'the Hall', 'the Study']
+all_weapon_names = ['the Knife', 'the Revolver', 'the Candlestick',
+                    'the Lead Pipe', 'the Rope', 'the Wrench']
+
+def make_names(prefix, all_names, count, fallback):
+    """Map variable names (e.g. 'A1') to display names for the first `count` entries."""
+    names = {}
+    for i in range(1, count + 1):
+        names[f'{prefix}{i}'] = all_names[i - 1] if i <= len(all_names) else fallback.format(i=i)
+    return names
+
+def make_category(prefix, title, names, true_text, false_text, clause):
+    """
+    Describe one column of the board; exactly one of its variables is True.
+    The text templates get the variable's display name as {name}.
+    """
+    return {
+        'prefix': prefix,
+        'title': title,
+        'names': names,
+        'true_text': true_text,
+        'false_text': false_text,
+        'clause': clause,
+    }
 
 def print_assignment(assignment):
     """Helper function to print truth assignments in a readable format"""
-    # Find the true character (murderer)
-    murderer = None
-    for i in range(1, 4):
-        if assignment[f'A{i}']:
-            murderer = character_names[f'A{i}']
-    
-    # Find the true location (crime scene)
-    crime_scene = None
-    for i in range(1, 4):
-        if assignment[f'B{i}']:
-            crime_scene = location_names[f'B{i}']
-    
-    # Find the true weapon
-    murder_weapon = None
-    for i in range(1, 4):
-        if assignment[f'C{i}']:
-            murder_weapon = weapon_names[f'C{i}']
+    # Find the true value in each category (murderer, crime scene, weapon, ...)
+    clauses = []
+    for category in categories:
+        for var, name in category['names'].items():
+            if assignment[var]:
+                clauses.append(category['clause'].format(name=name))
     
-    print(f"🔍 The murder was committed by {murderer} in {crime_scene} with {murder_weapon}.")
+    print(f"🔍 The murder was committed {' '.join(clauses)}.")
     
     # Also print the raw assignment values for debugging
-    print("\nDetailed assignment values:")
-    print("Characters:  ", end="")
-    for i in range(1, 4):
-        var = f'A{i}'
-        val = assignment[var]
-        name = character_names[var]
-        print(f"{name}={'✓' if val else '✗'}  ", end="")
-    
-    print("\nLocations:   ", end="")
-    for i in range(1, 4):
-        var = f'B{i}'
-        val = assignment[var]
-        name = location_names[var]
-        print(f"{name}={'✓' if val else '✗'}  ", end="")
-    
-    print("\nWeapons:     ", end="")
-    for i in range(1, 4):
-        var = f'C{i}'
-        val = assignment[var]
-        name = weapon_names[var]
-        print(f"{name}={'✓' if val else '✗'}  ", end="")
+    print("\nDetailed assignment values:", end="")
+    for category in categories:
+        print(f"\n{category['title'] + ':':<13}", end="")
+        for var, name in category['names'].items():
+            val = assignment[var]
+            print(f"{name}={'✓' if val else '✗'}  ", end="")
     print()
 
-# Setup the truth values - in each column, only one variable is True (1)
-possible_assignments = []
+class AssignmentSpace:
+    """
+    Every assignment where exactly one variable per category is True, indexed arithmetically.
+
+    Index i is a mixed-radix number with one digit per category (first category most
+    significant), so nothing is stored per assignment: assignments are only built as dicts
+    when one is looked up, and per-variable bitmasks are computed directly from the radix.
+    """
 
-# Generate all possible combinations where one variable per column is True
-for a_idx in range(1, 4):
-    for b_idx in range(1, 4):
-        for c_idx in range(1, 4):
-            assignment = {}
-            # Set all variables to False initially
-            for var in variables.keys():
+    def __init__(self, categories):
+        self.categories = categories
+        self.category_vars = [list(category['names']) for category in categories]
+        self.sizes = [len(var_names) for var_names in self.category_vars]
+        self.strides = []
+        stride = 1
+        for size in reversed(self.sizes):
+            self.strides.append(stride)
+            stride *= size
+        self.strides.reverse()
+        self.size = stride
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("assignment index out of range")
+        return self.from_true_variables(self.true_variables(index))
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    def true_variables(self, index):
+        """The variable that is True in each category for the assignment at `index`."""
+        return [
+            var_names[(index // stride) % size]
+            for var_names, stride, size in zip(self.category_vars, self.strides, self.sizes)
+        ]
+
+    def from_true_variables(self, true_vars):
+        """Build the assignment dict in which exactly `true_vars` are True."""
+        assignment = {}
+        for var_names in self.category_vars:
+            for var in var_names:
                 assignment[var] = False
-            
-            # Set one variable in each column to True
-            assignment[f'A{a_idx}'] = True
-            assignment[f'B{b_idx}'] = True
-            assignment[f'C{c_idx}'] = True
-            
-            possible_assignments.append(assignment)
-
-# Pick one assignment as our "actual" solution to the murder
-actual_assignment = random.choice(possible_assignments)
-
-# Print the actual solution
-print("="*60)
-print("🔍 ACTUAL MURDER SOLUTION (HIDDEN FROM PLAYERS)")
-print("="*60)
-print_assignment(actual_assignment)
-print("="*60)
+        for var in true_vars:
+            assignment[var] = True
+        return assignment
+
+    def index_of(self, assignment):
+        """Inverse of __getitem__."""
+        index = 0
+        for var_names, stride in zip(self.category_vars, self.strides):
+            for digit, var in enumerate(var_names):
+                if assignment[var]:
+                    index += digit * stride
+        return index
+
+    def symbol_mask(self, var):
+        """Bitmask of the assignment indices in which `var` is True."""
+        for var_names, stride, size in zip(self.category_vars, self.strides, self.sizes):
+            if var in var_names:
+                digit = var_names.index(var)
+                period = stride * size
+                # One run of `stride` set bits per period, repeated across the whole space
+                run = ((1 << stride) - 1) << (digit * stride)
+                repeat = ((1 << self.size) - 1) // ((1 << period) - 1)
+                return run * repeat
+        raise KeyError(var)
+
+# Bitmask of the assignments in which each variable is True (bit i <-> possible_assignments[i]),
+# filled in on first use so backends that never enumerate the board don't pay for it
+symbol_masks = {}
+# Cache of compiled statements: expression -> bitmask of the assignments that satisfy it
+statement_masks = {}
+
+def configure_board(num_characters=NUM_CHARACTERS, num_locations=NUM_LOCATIONS, num_weapons=NUM_WEAPONS,
+                    extra_categories=()):
+    """
+    Set up the board every other function works on: the categories, their variables and the
+    assignment space. Calling it again switches boards and clears the per-board caches.
+    """
+    global character_names, location_names, weapon_names, categories, variables, variable_categories
+    global possible_assignments, all_assignments_mask, board_config
+
+    # The arguments, so run_in_pool can set the same board up in its worker processes
+    board_config = (num_characters, num_locations, num_weapons, tuple(extra_categories))
+
+    # Define the names for better natural language expression
+    character_names = make_names('A', all_character_names, num_characters, 'Suspect {i}')
+    location_names = make_names('B', all_location_names, num_locations, 'Room {i}')
+    weapon_names = make_names('C', all_weapon_names, num_weapons, 'Weapon {i}')
+
+    categories = [
+        # A variables are characters
+        make_category('A', 'Characters', character_names,
+                      "the murderer was {name}", "the murderer was not {name}", "by {name}"),
+        # B variables are locations
+        make_category('B', 'Locations', location_names,
+                      "the murder happened in {name}", "the murder did not happen in {name}", "in {name}"),
+        # C variables are weapons
+        make_category('C', 'Weapons', weapon_names,
+                      "{name} was the murder weapon", "{name} was not the murder weapon", "with {name}"),
+    ]
+    # Custom boards can add more categories, e.g.
+    # make_category('D', 'Times', {'D1': 'midnight', 'D2': 'dawn'},
+    #               "it happened at {name}", "it did not happen at {name}", "at {name}")
+    categories.extend(extra_categories)
+
+    # Nodes built before are still valid expressions, they just stop being shared with new ones
+    expression_nodes.clear()
+
+    # Initialize all variables
+    variables = {}
+    variable_categories = {}
+    for category in categories:
+        for var_name in category['names']:
+            variables[var_name] = Symbol(var_name)
+            variable_categories[var_name] = category
+
+    # Setup the truth values - in each column, only one variable is True (1)
+    possible_assignments = AssignmentSpace(categories)
+    all_assignments_mask = (1 << len(possible_assignments)) - 1
+
+    symbol_masks.clear()
+    statement_masks.clear()
+    natural_language_cache.clear()
+
+configure_board()
 
 def count_propositions(expr):
     """Count the number of propositions (variables) in an expression."""
-    if isinstance(expr, Symbol):
-        return 1
-    elif expr.__class__.__name__ == 'NOT':
-        return count_propositions(expr.args[0])
-    elif expr.__class__.__name__ in ['AND', 'OR']:
-        # Count propositions in each argument
-        return sum(count_propositions(arg) for arg in expr.args)
-    else:
-        # For any other type, return 0
-        return 0
+    # Every node counts its propositions when it is built
+    return expr.propositions
 
-def generate_random_expression(variables, actual_assignment, max_propositions=4, current_depth=0):
+def generate_random_expression(variables, actual_assignment, max_propositions=4, current_depth=0, rng=random):
     """Generate a random boolean expression that evaluates to True under the actual assignment.
     Ensures no more than max_propositions variables are used."""
     # Different types of expressions to generate
@@ -223,25 +418,25 @@ def generate_random_expression(variables, actual_assignment, max_propositions=4,
     if current_depth > 2:
         expression_types = ["direct", "direct", "negation", "negation", "implication"] + expression_types
     
-    expr_type = random.choice(expression_types)
+    expr_type = rng.choice(expression_types)
     
     if expr_type == "direct":
         # Pick a random variable
-        var_name = random.choice(list(variables.keys()))
+        var_name = rng.choice(list(variables.keys()))
         var = variables[var_name]
         # If it's true in the actual assignment, return the variable, otherwise its negation
         return var if actual_assignment[var_name] else NOT(var)
     
     elif expr_type == "negation":
         # Pick a random variable
-        var_name = random.choice(list(variables.keys()))
+        var_name = rng.choice(list(variables.keys()))
         var = variables[var_name]
         # If it's false in the actual assignment, return NOT(var), otherwise var
         return NOT(var) if not actual_assignment[var_name] else var
     
     elif expr_type == "implication":
         # Pick two random variables
-        var1_name, var2_name = random.sample(list(variables.keys()), 2)
+        var1_name, var2_name = rng.sample(list(variables.keys()), 2)
         var1, var2 = variables[var1_name], variables[var2_name]
         
         # Determine if var1 => var2 is true under the assignment
@@ -265,125 +460,514 @@ def generate_random_expression(variables, actual_assignment, max_propositions=4,
         # We'll allocate propositions for each branch proportionally
         max_props_per_branch = max(1, max_propositions // 2)
         
-        expr1 = generate_random_expression(variables, actual_assignment, max_props_per_branch, current_depth + 1)
-        props_used = count_propositions(expr1)
+        expr1 = generate_random_expression(variables, actual_assignment, max_props_per_branch, current_depth + 1, rng)
+        props_used = expr1.propositions
         remaining_props = max(1, max_propositions - props_used)
         
-        expr2 = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1)
+        expr2 = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1, rng)
         
-        # Check if the combined expression exceeds max_propositions
-        combined_expr = AND(expr1, expr2)
-        if count_propositions(combined_expr) > max_propositions:
+        # Check if the combined expression would exceed max_propositions before building it
+        if props_used + expr2.propositions > max_propositions:
             # If it does, just return one of the sub-expressions
             return expr1
-        return combined_expr
+        return AND(expr1, expr2)
     
     elif expr_type == "or":
         # Generate sub-expressions similar to AND case
         max_props_per_branch = max(1, max_propositions // 2)
         
-        expr1 = generate_random_expression(variables, actual_assignment, max_props_per_branch, current_depth + 1)
-        props_used = count_propositions(expr1)
+        expr1 = generate_random_expression(variables, actual_assignment, max_props_per_branch, current_depth + 1, rng)
+        props_used = expr1.propositions
         remaining_props = max(1, max_propositions - props_used)
         
         # For the second expression, we can either generate one that's True or False
-        if random.choice([True, False]):
-            expr2 = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1)
+        if rng.choice([True, False]):
+            expr2 = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1, rng)
         else:
             # Generate a likely False expression (opposite of a True one)
-            true_expr = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1)
+            true_expr = generate_random_expression(variables, actual_assignment, remaining_props, current_depth + 1, rng)
             expr2 = NOT(true_expr)
         
-        # Check if the combined expression exceeds max_propositions
-        combined_expr = OR(expr1, expr2)
-        if count_propositions(combined_expr) > max_propositions:
+        # Check if the combined expression would exceed max_propositions before building it
+        if props_used + expr2.propositions > max_propositions:
             # If it does, just return one of the sub-expressions
             return expr1
-        return combined_expr
+        return OR(expr1, expr2)
 
-# Generate 50 unique conditional statements
-conditional_statements = []
-for _ in range(50):
-    # Generate a new expression that evaluates to True with max 4 propositions
-    expr = generate_random_expression(variables, actual_assignment, max_propositions=4)
-    
-    # Convert to string for easier comparison to avoid duplicates
-    expr_str = str(expr)
-    
-    # Check if this expression or a simplified version is already in our list
-    if expr_str not in [str(e) for e in conditional_statements]:
-        conditional_statements.append(expr)
+def write_statements_csv(conditional_statements, path='logical_statements.csv'):
+    """Write the statements to a CSV file in natural language format"""
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Statement Number', 'Logical Statement'])
+        for i, expr in enumerate(conditional_statements, 1):
+            writer.writerow([i, statement_text(expr)])
+
+# Clue index: every distinct clue meaning for a board, precomputed once and memory-mapped
+
+CLUE_INDEX_MAGIC = b'CLUEIDX1'
+# Postfix opcodes in the index; smaller codes are variable numbers
+_CODE_NOT, _CODE_AND, _CODE_OR = 253, 254, 255
+
+def encode_expression(expr, var_numbers):
+    """
+    Postfix bytes for an expression, with variables numbered by var_numbers (name -> number).
+    AND/OR with more than two operands are stored as a chain of two-operand ones.
+    """
+    if expr.op == 'VAR':
+        return bytes([var_numbers[expr.obj]])
+    if expr.op == 'NOT':
+        return encode_expression(expr.args[0], var_numbers) + bytes([_CODE_NOT])
+    operator = bytes([_CODE_AND if expr.op == 'AND' else _CODE_OR])
+    code = encode_expression(expr.args[0], var_numbers)
+    for arg in expr.args[1:]:
+        code += encode_expression(arg, var_numbers) + operator
+    return code
+
+def decode_expression(code, var_names):
+    """Inverse of encode_expression, with var_names listing the variables by number."""
+    stack = []
+    for byte in code:
+        if byte == _CODE_NOT:
+            stack.append(NOT(stack.pop()))
+        elif byte == _CODE_AND or byte == _CODE_OR:
+            second = stack.pop()
+            stack.append((AND if byte == _CODE_AND else OR)(stack.pop(), second))
+        else:
+            stack.append(Symbol(var_names[byte]))
+    return stack.pop()
+
+def _clue_shapes(budget, base, memo):
+    """
+    Every meaning generate_random_expression can produce with a proposition budget, as
+    mask -> (propositions, postfix code), keeping the expression with the fewest propositions.
+
+    Follows the generator's rules: a literal or an implication at any budget, or the AND/OR of
+    a clue with budget // 2 and one with whatever that leaves, as long as the two fit together.
+    """
+    if budget in memo:
+        return memo[budget]
+    shapes = dict(base)
+    if budget >= 2:
+        first = _clue_shapes(max(1, budget // 2), base, memo)
+        for mask1, (props1, code1) in first.items():
+            second = _clue_shapes(max(1, budget - props1), base, memo)
+            for mask2, (props2, code2) in second.items():
+                props = props1 + props2
+                if props > budget:
+                    continue
+                # AND(e1, e2), OR(e1, e2) and OR(e1, NOT(e2))
+                for mask, suffix in ((mask1 & mask2, (_CODE_AND,)), (mask1 | mask2, (_CODE_OR,)),
+                                     (mask1 | (all_assignments_mask ^ mask2), (_CODE_NOT, _CODE_OR))):
+                    known = shapes.get(mask)
+                    if known is None or known[0] > props:
+                        shapes[mask] = (props, code1 + code2 + bytes(suffix))
+    memo[budget] = shapes
+    return shapes
 
-# Print the conditional statements
-print("="*60)
-print("📜 WITNESS STATEMENTS AND CLUES")
-print("="*60)
-for i, expr in enumerate(conditional_statements, 1):
-    natural_lang_expr = expr_to_natural_language(expr)
-    print(f"{i:2d}. {natural_lang_expr}")
-print()
-
-# Write the statements to a CSV file in natural language format
-with open('logical_statements.csv', 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['Statement Number', 'Logical Statement'])
-    for i, expr in enumerate(conditional_statements, 1):
-        natural_lang_expr = expr_to_natural_language(expr)
-        writer.writerow([i, natural_lang_expr])
-
-print("✅ Logical statements have been written to 'logical_statements.csv'")
+def clue_meanings(max_propositions=4):
+    """
+    Enumerate every distinct clue meaning on the current board, as mask -> (propositions, code).
+    Tautologies and contradictions are left out, since they can't be useful clues.
+    """
+    var_names = [var for names in possible_assignments.category_vars for var in names]
+    if len(var_names) >= _CODE_NOT:
+        raise ValueError(f"a clue index supports at most {_CODE_NOT - 1} variables")
+    masks = [statement_mask(variables[var]) for var in var_names]
+
+    base = {}
+    for i, mask in enumerate(masks):
+        base[mask] = (1, bytes([i]))
+        base[all_assignments_mask ^ mask] = (1, bytes([i, _CODE_NOT]))
+    # Implies(a, b) and Implies(a, NOT(b)), i.e. OR(NOT(a), b) and OR(NOT(a), NOT(b))
+    for i, mask1 in enumerate(masks):
+        for j, mask2 in enumerate(masks):
+            if i != j:
+                base.setdefault((all_assignments_mask ^ mask1) | mask2, (2, bytes([i, _CODE_NOT, j, _CODE_OR])))
+                base.setdefault((all_assignments_mask ^ mask1) | (all_assignments_mask ^ mask2),
+                                (2, bytes([i, _CODE_NOT, j, _CODE_NOT, _CODE_OR])))
+
+    shapes = _clue_shapes(max_propositions, base, {})
+    return {mask: entry for mask, entry in shapes.items() if mask and mask != all_assignments_mask}
+
+def build_clue_index(path, max_propositions=4):
+    """
+    Write the clue index for the current board and max_propositions to `path`.
+    Returns the number of entries (distinct clue meanings).
+
+    The file is a small JSON header followed by one fixed-width bitmask per entry and the
+    entries' expressions in postfix form. Building it on the full 6x9x6 board takes a few seconds
+    and about 60 MB; the 3x3x3 board is well under a megabyte.
+    """
+    meanings = clue_meanings(max_propositions)
+    mask_bytes = (len(possible_assignments) + 7) // 8
+    code_offsets = array('I', [0])
+    codes = bytearray()
+    masks = bytearray()
+    for mask, (_, code) in meanings.items():
+        masks += mask.to_bytes(mask_bytes, 'little')
+        codes += code
+        code_offsets.append(len(codes))
+
+    header = {
+        'categories': possible_assignments.category_vars,
+        'max_propositions': max_propositions,
+        'entries': len(meanings),
+        'mask_bytes': mask_bytes,
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    header_bytes += b' ' * (-(len(CLUE_INDEX_MAGIC) + 4 + len(header_bytes)) % 8)
+    # Keep the offsets array 4-byte aligned after the masks
+    masks += bytes(-len(masks) % 4)
+    with open(path, 'wb') as f:
+        f.write(CLUE_INDEX_MAGIC)
+        f.write(len(header_bytes).to_bytes(4, 'little'))
+        f.write(header_bytes)
+        f.write(masks)
+        f.write(code_offsets.tobytes())
+        f.write(codes)
+    return len(meanings)
+
+class ClueIndex:
+    """
+    A clue index written by build_clue_index, memory-mapped read-only.
+
+    The pages are shared through the OS cache, so any number of worker processes can open the
+    same file without each holding a copy. sample() draws a clue that is True under a given
+    solution in expected constant time: it picks entries uniformly and keeps the first whose
+    stored mask has the solution's bit set, so every distinct meaning is equally likely.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:len(CLUE_INDEX_MAGIC)] != CLUE_INDEX_MAGIC:
+            raise ValueError(f"'{path}' is not a clue index")
+        start = len(CLUE_INDEX_MAGIC) + 4
+        header_length = int.from_bytes(view[len(CLUE_INDEX_MAGIC):start], 'little')
+        header = json.loads(bytes(view[start:start + header_length]))
+        if header['categories'] != possible_assignments.category_vars:
+            raise ValueError(f"'{path}' was built for a different board")
+
+        self.max_propositions = header['max_propositions']
+        self.entries = header['entries']
+        self.mask_bytes = header['mask_bytes']
+        self._var_names = [var for names in header['categories'] for var in names]
+        masks_start = start + header_length
+        masks_end = masks_start + self.entries * self.mask_bytes
+        offsets_start = masks_end + (-masks_end % 4)
+        offsets_end = offsets_start + (self.entries + 1) * 4
+        self._masks = view[masks_start:masks_end]
+        self._code_offsets = view[offsets_start:offsets_end].cast('I')
+        self._codes = view[offsets_end:]
+        # Entries decoded so far, so a clue drawn again costs a dict lookup
+        self._expressions = {}
+
+    def __len__(self):
+        return self.entries
+
+    def __reduce__(self):
+        # Workers reopen (and share) the mapping instead of receiving a copy
+        return ClueIndex, (self.path,)
+
+    def mask(self, entry):
+        start = entry * self.mask_bytes
+        return int.from_bytes(self._masks[start:start + self.mask_bytes], 'little')
+
+    def expression(self, entry):
+        """Decode an entry into an expression, priming statement_masks with its stored mask."""
+        expr = self._expressions.get(entry)
+        if expr is not None:
+            return expr
+        code = self._codes[self._code_offsets[entry]:self._code_offsets[entry + 1]]
+        expr = self._expressions[entry] = decode_expression(code, self._var_names)
+        if expr not in statement_masks:
+            statement_masks[expr] = self.mask(entry)
+        return expr
+
+    def sample(self, solution, rng=random):
+        """A random clue that is True under possible_assignments[solution]."""
+        byte, bit = divmod(solution, 8)
+        while True:
+            entry = rng.randrange(self.entries)
+            if self._masks[entry * self.mask_bytes + byte] >> bit & 1:
+                return self.expression(entry)
+
+    def close(self):
+        self._masks.release()
+        self._code_offsets.release()
+        self._codes.release()
+        self._mmap.close()
+
+# Statement store: append-only columnar export of generated statements
+
+STATEMENT_COLUMNS = {
+    # column file -> array typecode (one item per statement)
+    'puzzle': 'q',       # puzzle id (the seed, by default)
+    'solution': 'I',     # index of the puzzle's hidden solution in possible_assignments
+    'propositions': 'B', # proposition count
+    'code_end': 'Q',     # end of the statement's postfix code in codes.bin
+}
+
+class StatementStore:
+    """
+    Append statements from many puzzles to a columnar export directory, alongside the CSV.
+
+    Every column is its own append-only file: the array columns in STATEMENT_COLUMNS, one
+    fixed-width model bitmask per statement in masks.bin (bit i <-> possible_assignments[i]), and
+    the expressions in postfix form (see encode_expression) in codes.bin. header.json records the
+    board. A reader only counts statements every column has, and opening a store for appending
+    first cuts off whatever an interrupted append left behind, so a store can be appended to
+    across runs. Read it with StatementReader.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        header = _statement_store_header()
+        header_path = os.path.join(path, 'header.json')
+        if os.path.exists(header_path):
+            with open(header_path) as f:
+                if json.load(f) != header:
+                    raise ValueError(f"'{path}' holds statements for a different board")
+        else:
+            with open(header_path, 'w') as f:
+                json.dump(header, f)
+        self.mask_bytes = header['mask_bytes']
+        self._var_numbers = {var: i for i, var in enumerate(var for names in header['categories'] for var in names)}
+        self._files = {name: open(os.path.join(path, name + '.bin'), 'ab')
+                       for name in ('codes', 'masks', *STATEMENT_COLUMNS)}
+        self._codes_size = self._truncate_partial_append()
+
+    def _truncate_partial_append(self):
+        """Cut every column back to the statements they all have; returns the size of codes.bin."""
+        itemsizes = {name: array(typecode).itemsize for name, typecode in STATEMENT_COLUMNS.items()}
+        itemsizes['masks'] = self.mask_bytes
+        count = min(os.path.getsize(self._files[name].name) // itemsize for name, itemsize in itemsizes.items())
+        # A statement is only there if its code is too: code_end only grows, so the statements
+        # whose code fits in codes.bin are a prefix
+        code_end = array(STATEMENT_COLUMNS['code_end'])
+        with open(self._files['code_end'].name, 'rb') as f:
+            code_end.frombytes(f.read(count * code_end.itemsize))
+        count = bisect.bisect_right(code_end, os.path.getsize(self._files['codes'].name))
+        for name, itemsize in itemsizes.items():
+            self._files[name].truncate(count * itemsize)
+        codes_size = code_end[count - 1] if count else 0
+        self._files['codes'].truncate(codes_size)
+        return codes_size
+
+    def append(self, statements, puzzle_id, solution):
+        """Append statements that belong to one puzzle with the given solution index."""
+        columns = {name: array(typecode) for name, typecode in STATEMENT_COLUMNS.items()}
+        codes = bytearray()
+        masks = bytearray()
+        for expr in statements:
+            codes += encode_expression(expr, self._var_numbers)
+            masks += statement_mask(expr).to_bytes(self.mask_bytes, 'little')
+            columns['puzzle'].append(puzzle_id)
+            columns['solution'].append(solution)
+            columns['propositions'].append(expr.propositions)
+            columns['code_end'].append(self._codes_size + len(codes))
+        # A reader only counts statements every column has, so a crash mid-append never exposes a
+        # half-written one
+        self._files['codes'].write(codes)
+        self._files['masks'].write(masks)
+        for name in STATEMENT_COLUMNS:
+            self._files[name].write(columns[name].tobytes())
+        self._codes_size += len(codes)
+
+    def append_puzzle(self, puzzle, puzzle_id=None):
+        """Append a puzzle's statements, identified by its seed unless puzzle_id is given."""
+        puzzle_id = puzzle['seed'] if puzzle_id is None else puzzle_id
+        if puzzle_id is None:
+            raise ValueError("the puzzle has no seed, so it needs a puzzle_id")
+        self.append(puzzle['statements'], puzzle_id, possible_assignments.index_of(puzzle['actual_assignment']))
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _statement_store_header():
+    return {
+        'categories': possible_assignments.category_vars,
+        'mask_bytes': (len(possible_assignments) + 7) // 8,
+    }
+
+class StatementReader:
+    """
+    Memory-mapped, read-only view of a StatementStore directory, as of when it was opened.
+
+    The columns are exposed as memoryviews (puzzle, solution, propositions, code_end), so a scan
+    over millions of statements touches only the pages it reads. The same files can also be
+    opened with numpy.memmap using the typecodes in STATEMENT_COLUMNS.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'header.json')) as f:
+            header = json.load(f)
+        if header != _statement_store_header():
+            raise ValueError(f"'{path}' holds statements for a different board")
+        self.mask_bytes = header['mask_bytes']
+        self._var_names = [var for names in header['categories'] for var in names]
+
+        self._mmaps = []
+        views = {name: self._map(name) for name in ('codes', 'masks', *STATEMENT_COLUMNS)}
+        count = len(views['masks']) // self.mask_bytes
+        for name, typecode in STATEMENT_COLUMNS.items():
+            itemsize = array(typecode).itemsize
+            count = min(count, len(views[name]) // itemsize)
+        # Nor does it count statements whose code isn't all in codes.bin yet
+        typecode = STATEMENT_COLUMNS['code_end']
+        code_end = views['code_end'][:count * array(typecode).itemsize].cast(typecode)
+        count = bisect.bisect_right(code_end, len(views['codes']))
+        code_end.release()
+        self.count = count
+        self.codes = views['codes']
+        self.masks = views['masks'][:count * self.mask_bytes]
+        for name, typecode in STATEMENT_COLUMNS.items():
+            itemsize = array(typecode).itemsize
+            setattr(self, name, views[name][:count * itemsize].cast(typecode))
+
+    def _map(self, name):
+        with open(os.path.join(self.path, name + '.bin'), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b'')
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmaps.append(mapping)
+        return memoryview(mapping)
+
+    def __len__(self):
+        return self.count
+
+    def mask(self, i):
+        start = i * self.mask_bytes
+        return int.from_bytes(self.masks[start:start + self.mask_bytes], 'little')
+
+    def has_model(self, i, assignment_index):
+        """Whether statement i is True under possible_assignments[assignment_index]."""
+        byte, bit = divmod(assignment_index, 8)
+        return bool(self.masks[i * self.mask_bytes + byte] >> bit & 1)
+
+    def expression(self, i):
+        start = self.code_end[i - 1] if i else 0
+        return decode_expression(self.codes[start:self.code_end[i]], self._var_names)
+
+    def close(self):
+        for name in ('codes', 'masks', *STATEMENT_COLUMNS):
+            getattr(self, name).release()
+        for mapping in self._mmaps:
+            mapping.close()
 
 # 3. Evaluate which combination of statements can determine the murderer, location, and weapon
-def can_determine_truth_values(statements_subset, possible_assignments):
+
+def expression_mask(expr):
+    """
+    Compile a boolean expression into an integer bitmask over possible_assignments.
+    Bit i is set when the expression is True under possible_assignments[i].
+    """
+    op = expr.op
+    if op == 'VAR':
+        mask = symbol_masks.get(expr.obj)
+        if mask is None:
+            mask = symbol_masks[expr.obj] = possible_assignments.symbol_mask(expr.obj)
+        return mask
+    elif op == 'NOT':
+        return all_assignments_mask ^ expression_mask(expr.args[0])
+    elif op == 'AND':
+        mask = all_assignments_mask
+        for arg in expr.args:
+            mask &= expression_mask(arg)
+        return mask
+    elif op == 'OR':
+        # Also covers our Implies function, since it's just OR(NOT(a), b)
+        mask = 0
+        for arg in expr.args:
+            mask |= expression_mask(arg)
+        return mask
+    else:
+        raise ValueError(f"Unsupported expression type: {type(expr)} - {expr}")
+
+def statement_mask(expr):
+    """Return the (cached) bitmask of the assignments that satisfy a statement."""
+    mask = statement_masks.get(expr)
+    if mask is None:
+        if active_stats is not None:
+            active_stats.count('statements_compiled')
+        mask = statement_masks[expr] = expression_mask(expr)
+    return mask
+
+def mask_to_assignments(mask, possible_assignments):
+    """Expand a bitmask back into the list of assignments it selects."""
+    assignments = []
+    while mask:
+        low_bit = mask & -mask
+        assignments.append(possible_assignments[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return assignments
+
+def can_determine_truth_values(statements_subset, possible_assignments, backend=None):
     """
     Check if a subset of statements can uniquely determine who committed the crime, where, and with what.
-    Returns True if the statements can uniquely identify the actual assignment.
+    Returns True if the statements can uniquely identify the actual assignment, along with a
+    list holding that assignment (empty when they can't).
+
+    The work is done by one of solver_backends (SOLVER_BACKEND unless `backend` is given).
     """
-    # Start with all possible assignments
-    consistent_assignments = possible_assignments.copy()
-    
-    # Filter out assignments that don't satisfy all statements in the subset
-    for assignment in list(possible_assignments):  # Create a copy to iterate over
-        is_consistent = True
-        for expr in statements_subset:
-            # Manually evaluate the expression for this assignment
-            result = evaluate_expression(expr, assignment)
-            if not result:
-                if assignment in consistent_assignments:
-                    consistent_assignments.remove(assignment)
-                is_consistent = False
-                break
-                
-        # If we've already determined it's inconsistent, we can move on
-        if not is_consistent:
-            continue
-    
-    # If only one assignment is left, we've uniquely determined the murderer, location, and weapon
-    return len(consistent_assignments) == 1, consistent_assignments
+    if active_stats is not None:
+        active_stats.count('determine_calls')
+    return solver_backends[backend or SOLVER_BACKEND](statements_subset, possible_assignments)
+
+def truth_table_determine(statements_subset, possible_assignments):
+    """
+    Each statement is compiled once into a bitmask, so the consistent assignments of a subset are
+    just the bitwise AND of its statements' masks.
+    """
+    consistent_mask = all_assignments_mask
+    for expr in statements_subset:
+        consistent_mask &= statement_mask(expr)
+
+    # If only one assignment is left, we've uniquely determined the murderer, location, and weapon.
+    # The assignment is only looked up then: most subsets a solver checks aren't determined.
+    if consistent_mask.bit_count() == 1:
+        return True, mask_to_assignments(consistent_mask, possible_assignments)
+    return False, []
 
 def evaluate_expression(expr, assignment):
     """
     Manually evaluate a boolean expression given an assignment of variable values.
     This avoids the issue with the boolean library's substitution mechanism.
     """
-    if isinstance(expr, Symbol):
+    op = expr.op
+    if op == 'VAR':
         var_name = expr.obj
         return assignment[var_name]
     
-    elif expr.__class__.__name__ == 'NOT':
+    elif op == 'NOT':
         # NOT operation
         return not evaluate_expression(expr.args[0], assignment)
     
-    elif expr.__class__.__name__ == 'AND':
+    elif op == 'AND':
         # AND operation
         return all(evaluate_expression(arg, assignment) for arg in expr.args)
     
-    elif expr.__class__.__name__ == 'OR':
+    elif op == 'OR':
         # OR operation
         return any(evaluate_expression(arg, assignment) for arg in expr.args)
     
     # For our custom Implies function
-    elif isinstance(expr, OR) and len(expr.args) == 2 and isinstance(expr.args[0], NOT):
+    elif op == 'OR' and len(expr.args) == 2 and expr.args[0].op == 'NOT':
         # This is our Implies function: OR(NOT(a), b)
         # It's equivalent to: NOT a OR b
         return (not evaluate_expression(expr.args[0].args[0], assignment)) or evaluate_expression(expr.args[1], assignment)
@@ -393,105 +977,1059 @@ def evaluate_expression(expr, assignment):
         # For any other type of expression
         raise ValueError(f"Unsupported expression type: {type(expr)} - {expr}")
 
-# New approach: reveal statements one by one
-print("="*60)
-print("🔍 CLUE: THE LOGICAL DEDUCTION MURDER MYSTERY GAME 🕵️")
-print("="*60)
-print("You have a murder to solve! Statements from witnesses will be revealed one by one.")
-print("In each round, we'll check if the currently available statements")
-print("are enough to determine who committed the crime, where, and with what weapon.\n")
-
-# Shuffle the statements to reveal them in random order
-random.shuffle(conditional_statements)
-
-# Start with only 1 statement available
-available_statements = []
-determined = False
-round_num = 0
-
-# Continue revealing statements until we find a solution or run out of statements
-while round_num < len(conditional_statements) and not determined:
-    round_num += 1
-    
-    # Reveal one more statement
-    available_statements.append(conditional_statements[round_num - 1])
-    
-    print("\n" + "-"*60)
-    print(f"🔄 INVESTIGATION ROUND {round_num}")
-    print("-"*60)
-    print(f"Available witness testimonies ({len(available_statements)}):")
-    for i, stmt in enumerate(available_statements, 1):
-        natural_lang_stmt = expr_to_natural_language(stmt)
-        print(f"{i:2d}. {natural_lang_stmt}")
-    
-    # Check all possible subsets of the available statements
-    print("\nAnalyzing witness testimonies to solve the case...")
-    
-    determined_combinations = []
-    all_combinations_checked = []
-    
-    # Generate all possible combinations of the available statements, starting from smaller sizes
-    for r in range(1, len(available_statements) + 1):
-        for subset in itertools.combinations(available_statements, r):
-            # Skip any subset that contains an already found solution
-            should_skip = False
-            for found_size, found_subset, _ in determined_combinations:
-                if all(stmt in subset for stmt in found_subset):
-                    should_skip = True
+def evaluate_partial(expr, values):
+    """
+    Evaluate an expression when only some variables are known.
+    Returns True or False when the known variables already decide it, and None otherwise.
+    """
+    op = expr.op
+    if op == 'VAR':
+        return values.get(expr.obj)
+    elif op == 'NOT':
+        result = evaluate_partial(expr.args[0], values)
+        return None if result is None else not result
+    elif op == 'AND':
+        result = True
+        for arg in expr.args:
+            arg_result = evaluate_partial(arg, values)
+            if arg_result is False:
+                return False
+            if arg_result is None:
+                result = None
+        return result
+    elif op == 'OR':
+        result = False
+        for arg in expr.args:
+            arg_result = evaluate_partial(arg, values)
+            if arg_result is True:
+                return True
+            if arg_result is None:
+                result = None
+        return result
+    else:
+        raise ValueError(f"Unsupported expression type: {type(expr)} - {expr}")
+
+def dpll_models(statements, category_vars, limit=2):
+    """
+    Find up to `limit` assignments that satisfy every statement without enumerating the board.
+
+    Each category is an exactly-one constraint over its variables, so instead of branching on single
+    variables the search picks which variable of a category is True. Returns the models as lists
+    of the True variable in each category.
+    """
+    models = []
+    _dpll_search(list(statements), [list(var_names) for var_names in category_vars],
+                 category_vars, limit, models)
+    return models
+
+def _domain_values(domains, category_vars):
+    """Known variable values: removed candidates are False, a lone candidate is True."""
+    values = {}
+    for domain, var_names in zip(domains, category_vars):
+        for var in var_names:
+            if var not in domain:
+                values[var] = False
+        if len(domain) == 1:
+            values[domain[0]] = True
+    return values
+
+def _dpll_search(statements, domains, category_vars, limit, models):
+    while True:
+        values = _domain_values(domains, category_vars)
+        pending = []
+        for stmt in statements:
+            result = evaluate_partial(stmt, values)
+            if result is False:
+                return
+            if result is None:
+                pending.append(stmt)
+        statements = pending
+
+        # Everything is satisfied, so every remaining combination is a model
+        if not statements:
+            for true_vars in itertools.product(*domains):
+                models.append(list(true_vars))
+                if len(models) >= limit:
+                    return
+            return
+
+        # Propagate: drop any candidate whose choice would falsify a statement outright
+        changed = False
+        for k, domain in enumerate(domains):
+            if len(domain) == 1:
+                continue
+            for var in list(domain):
+                trial = dict(values)
+                for other in domain:
+                    trial[other] = other == var
+                if any(evaluate_partial(stmt, trial) is False for stmt in statements):
+                    domain.remove(var)
+                    changed = True
+            if not domain:
+                return
+        if not changed:
+            break
+
+    # Branch on the undecided category with the fewest candidates left
+    k = min((k for k, domain in enumerate(domains) if len(domain) > 1), key=lambda k: len(domains[k]))
+    for var in domains[k]:
+        branch_domains = [list(domain) for domain in domains]
+        branch_domains[k] = [var]
+        _dpll_search(statements, branch_domains, category_vars, limit, models)
+        if len(models) >= limit:
+            return
+
+def dpll_determine(statements_subset, possible_assignments):
+    """
+    Count models symbolically, stopping as soon as a second one turns up.
+    """
+    models = dpll_models(statements_subset, possible_assignments.category_vars, limit=2)
+    if len(models) == 1:
+        return True, [possible_assignments.from_true_variables(models[0])]
+    return False, []
+
+# Backends for can_determine_truth_values, selected by SOLVER_BACKEND
+solver_backends = {
+    'truth_table': truth_table_determine,
+    'dpll': dpll_determine,
+}
+
+def cross_check_backends(statement_sets, possible_assignments):
+    """
+    Run every solver backend on each statement set and return the sets they disagree on.
+    Backends agree when they give the same verdict and, if determined, the same assignment.
+    """
+    disagreements = []
+    for statements_subset in statement_sets:
+        verdicts = set()
+        for backend in solver_backends:
+            success, remaining = can_determine_truth_values(statements_subset, possible_assignments, backend)
+            solution = possible_assignments.index_of(remaining[0]) if success else None
+            verdicts.add((success, solution))
+        if len(verdicts) > 1:
+            disagreements.append(statements_subset)
+    return disagreements
+
+# The DeductionStats collecting counts for the round in progress, if any
+active_stats = None
+
+class DeductionStats:
+    """
+    Opt-in counters and timings for the reveal loop, one entry per round.
+
+    Pass one to reveal_rounds (or solve_puzzle/round_events/play). While a round runs, the solver,
+    statement_mask and can_determine_truth_values add to its counters. A single round can also be run under cProfile
+    by giving its number as profile_round.
+    """
+
+    def __init__(self, profile_round=None):
+        self.rounds = []
+        self.profile_round = profile_round
+        self.profiler = None
+        self._current = None
+        self._started = None
+
+    def start_round(self, round_num):
+        global active_stats
+        self._current = {
+            'round': round_num,
+            'subsets_enumerated': 0,
+            'subsets_pruned': 0,
+            'search_skipped': 0,
+            'statements_compiled': 0,
+            'determine_calls': 0,
+        }
+        active_stats = self
+        if round_num == self.profile_round:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self._started = (time.perf_counter(), time.process_time())
+
+    def end_round(self):
+        global active_stats
+        wall_start, cpu_start = self._started
+        self._current['wall_time'] = time.perf_counter() - wall_start
+        self._current['cpu_time'] = time.process_time() - cpu_start
+        if self._current['round'] == self.profile_round:
+            self.profiler.disable()
+        active_stats = None
+        self.rounds.append(self._current)
+        self._current = None
+
+    def count(self, name, amount=1):
+        self._current[name] += amount
+
+    def totals(self):
+        """Every counter and timing summed over the rounds so far."""
+        totals = {}
+        for round_stats in self.rounds:
+            for name, value in round_stats.items():
+                if name != 'round':
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def to_json(self):
+        return json.dumps({'rounds': self.rounds, 'totals': self.totals()}, indent=2)
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+    def print_profile(self, stream=None, sort='cumulative', limit=25):
+        """Print the cProfile report for profile_round (if it has run)."""
+        if self.profiler is None:
+            return
+        pstats.Stats(self.profiler, stream=stream or sys.stderr).sort_stats(sort).print_stats(limit)
+
+class IncrementalSolver:
+    """
+    Search for minimal statement subsets that solve the case, keeping state between rounds.
+
+    Solving the case means eliminating every wrong assignment, so this is a minimal set cover
+    search: each statement covers the assignments it rules out. Every earlier round has already
+    been searched, so when a statement is revealed only covers that include it can be new
+    solutions. Subsets are bitsets over statement indices, and a branch is pruned as soon as one
+    of its statements stops being needed, which also prunes every superset of a known solution.
+    """
+
+    def __init__(self, possible_assignments, stats=None):
+        self.possible_assignments = possible_assignments
+        self.stats = stats
+        self.statements = []
+        self.masks = []
+        # AND of every revealed statement's mask
+        self.combined_mask = all_assignments_mask
+        # covering_statements[i] is a bitset of the statements that rule out possible_assignments[i]
+        self.covering_statements = [0] * len(possible_assignments)
+        # Bitsets (over statement indices) of every minimal solution found so far
+        self.solutions = []
+        # Per-round counters for reporting
+        self.subsets_checked = 0
+        self.checked_sample = []
+        self._sample_size = 10
+
+    def reveal(self, statement, sample_size=10):
+        """
+        Add a statement and return the new minimal solving subsets as sorted index tuples.
+        A subset is minimal when it does not contain any other solving subset.
+        """
+        new_index = len(self.statements)
+        new_mask = statement_mask(statement)
+        self.statements.append(statement)
+        self.masks.append(new_mask)
+        self.combined_mask &= new_mask
+        eliminated = all_assignments_mask ^ new_mask
+        while eliminated:
+            low_bit = eliminated & -eliminated
+            self.covering_statements[low_bit.bit_length() - 1] |= 1 << new_index
+            eliminated ^= low_bit
+        self.subsets_checked = 0
+        self.checked_sample = []
+        self._sample_size = sample_size
+
+        # Even all the statements together can't pin the case down, so no subset can either
+        if self.combined_mask.bit_count() != 1:
+            if self.stats is not None:
+                self.stats.count('search_skipped')
+            return []
+
+        eliminated = all_assignments_mask ^ new_mask
+        found = []
+        self._search(
+            {new_index: eliminated},
+            all_assignments_mask ^ self.combined_mask ^ eliminated,
+            (1 << new_index) - 1,
+            found,
+        )
+
+        found.sort(key=lambda bits: (bits.bit_count(), self._indices(bits)))
+        self.solutions.extend(found)
+        return [self._indices(bits) for bits in found]
+
+    def _search(self, critical, uncovered, candidates, found):
+        """
+        Extend the subset whose members map to the wrong assignments only they rule out.
+        `uncovered` holds the wrong assignments nobody in the subset rules out yet.
+        """
+        bits = 0
+        for index in critical:
+            bits |= 1 << index
+        self._record_check(bits)
+        if not uncovered:
+            found.append(bits)
+            return
+
+        # Branch on the uncovered assignment that the fewest candidates can rule out
+        branch_statements = None
+        remaining = uncovered
+        while remaining:
+            low_bit = remaining & -remaining
+            options = candidates & self.covering_statements[low_bit.bit_length() - 1]
+            if branch_statements is None or options.bit_count() < branch_statements.bit_count():
+                branch_statements = options
+            remaining ^= low_bit
+        if not branch_statements:
+            return
+
+        # Each cover is generated once: every branch statement is withheld, and each branch hands
+        # its statement back when done, so later branches may use the earlier ones but never the
+        # later ones. A cover is found under the last branch statement it contains.
+        candidates &= ~branch_statements
+        for index in self._indices(branch_statements):
+            eliminated = all_assignments_mask ^ self.masks[index]
+            extended = {}
+            for member, private in critical.items():
+                private &= ~eliminated
+                if not private:
+                    # `member` became redundant, so this subset and its supersets aren't minimal
+                    if self.stats is not None:
+                        self.stats.count('subsets_pruned')
                     break
-            if should_skip:
+                extended[member] = private
+            else:
+                extended[index] = eliminated & uncovered
+                self._search(extended, uncovered & ~eliminated, candidates, found)
+            candidates |= 1 << index
+
+    def _record_check(self, bits):
+        self.subsets_checked += 1
+        if self.stats is not None:
+            self.stats.count('subsets_enumerated')
+        if len(self.checked_sample) < self._sample_size:
+            self.checked_sample.append(self._indices(bits))
+
+    @staticmethod
+    def _indices(bits):
+        """Turn a bitset of statement indices into a tuple of indices."""
+        indices = []
+        while bits:
+            low_bit = bits & -bits
+            indices.append(low_bit.bit_length() - 1)
+            bits ^= low_bit
+        return tuple(indices)
+
+def sum_masks(masks):
+    """Bitwise OR of the masks."""
+    union = 0
+    for mask in masks:
+        union |= mask
+    return union
+
+def _budget_spent(nodes, node_budget, deadline):
+    return (node_budget is not None and nodes >= node_budget) or (deadline is not None and time.perf_counter() > deadline)
+
+def minimum_clue_sets(statements, actual_assignment, time_budget=None, node_budget=None, max_solutions=100):
+    """
+    Find the fewest statements that together solve the case, by branch and bound.
+
+    This is minimum set cover: each statement covers the wrong assignments it rules out. Before
+    searching, statements that rule out a strict subset of what another rules out are dropped, and
+    so are wrong assignments that are ruled out whenever some other one is. A greedy cover gives
+    the first answer right away. The search then branches on the uncovered assignment with the
+    fewest statements left that rule it out, and prunes with a packing bound: uncovered assignments
+    that no single statement rules out two of each need a statement of their own.
+
+    The search stops after time_budget seconds or node_budget nodes, if given. Returns a dict with
+    the best size found, up to max_solutions subsets of that size (as sorted index tuples), whether
+    that size is proven minimal, and the number of nodes searched. Size is None when even all the
+    statements together can't solve the case.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    wrong_mask = all_assignments_mask ^ (1 << possible_assignments.index_of(actual_assignment))
+    eliminated = [(all_assignments_mask ^ statement_mask(expr)) & wrong_mask for expr in statements]
+    if sum_masks(eliminated) != wrong_mask:
+        return {'size': None, 'solutions': [], 'proven_minimal': True, 'nodes': 0}
+
+    # Drop dominated statements: another one rules out everything they do and more (or the same,
+    # and comes first). They are put back into the solutions at the end.
+    useful = []
+    for i, mask in enumerate(eliminated):
+        if mask and not any(j != i and mask & other == mask and (mask != other or j < i)
+                            for j, other in enumerate(eliminated)):
+            useful.append(i)
+
+    # covering[b] is a bitset (over positions in `useful`) of the statements that rule out bit b
+    covering = {}
+    for position, i in enumerate(useful):
+        for bit in _mask_bits(eliminated[i]):
+            covering[bit] = covering.get(bit, 0) | (1 << position)
+    # Drop dominated assignments: any statement set that rules out `other` also rules out `bit`
+    universe = 0
+    for bit, statements_bits in covering.items():
+        if not any(other != bit and statements_bits & options == options and (statements_bits != options or other < bit)
+                   for other, options in covering.items()):
+            universe |= bit
+    masks = [eliminated[i] & universe for i in useful]
+
+    def lower_bound(uncovered, allowed):
+        """Greedily pick uncovered assignments no single allowed statement covers two of."""
+        bound = 0
+        used = 0
+        for bit in sorted(_mask_bits(uncovered), key=lambda bit: (covering[bit] & allowed).bit_count()):
+            options = covering[bit] & allowed
+            if not options & used:
+                used |= options
+                bound += 1
+        return bound
+
+    # Start from a greedy cover with its redundant statements removed
+    greedy = []
+    uncovered = universe
+    while uncovered:
+        position = max(range(len(useful)), key=lambda position: (masks[position] & uncovered).bit_count())
+        greedy.append(position)
+        uncovered &= ~masks[position]
+    for position in list(greedy):
+        if sum_masks(masks[other] for other in greedy if other != position) == universe:
+            greedy.remove(position)
+    best_size = len(greedy)
+    best = {sum(1 << position for position in greedy)}
+    root_bound = lower_bound(universe, (1 << len(useful)) - 1)
+
+    nodes = 0
+    exhausted = False
+    def search(chosen, size, uncovered, allowed):
+        nonlocal nodes, exhausted, best_size, best
+        if _budget_spent(nodes, node_budget, deadline):
+            exhausted = True
+            return
+        nodes += 1
+        if not uncovered:
+            if size < best_size:
+                best_size, best = size, set()
+            if len(best) < max_solutions:
+                best.add(chosen)
+            return
+        # Once enough ties are collected, only strictly smaller covers are worth finding
+        limit = best_size if len(best) < max_solutions else best_size - 1
+        if size + lower_bound(uncovered, allowed) > limit:
+            return
+
+        # Branch on the uncovered assignment the fewest allowed statements rule out
+        branch = min(_mask_bits(uncovered), key=lambda bit: (covering[bit] & allowed).bit_count())
+        options = sorted(IncrementalSolver._indices(covering[branch] & allowed),
+                         key=lambda position: -(masks[position] & uncovered).bit_count())
+        for position in options:
+            # Each cover is generated once: later branches may not use the statements before them
+            allowed &= ~(1 << position)
+            search(chosen | (1 << position), size + 1, uncovered & ~masks[position], allowed)
+            if exhausted:
+                return
+
+    if root_bound < best_size or max_solutions > 1:
+        search(0, 0, universe, (1 << len(useful)) - 1)
+    proven_minimal = not exhausted or root_bound == best_size
+
+    # Put the dropped statements back, within what is left of the budget: one can replace any
+    # statement that rules out everything it does, as long as the subset still solves the case
+    substitutes = {i: [i] for i in useful}
+    for j, mask in enumerate(eliminated):
+        if j not in substitutes:
+            for i in useful:
+                if mask & eliminated[i] == mask:
+                    substitutes[i].append(j)
+    solutions = {tuple(sorted(useful[position] for position in IncrementalSolver._indices(bits))) for bits in best}
+    def expand(members, chosen, union):
+        """Try every substitute for members[len(chosen)], keeping only choices that can still cover."""
+        nonlocal nodes
+        if len(solutions) >= max_solutions or _budget_spent(nodes, node_budget, deadline):
+            return
+        nodes += 1
+        if len(chosen) == len(members):
+            if union == wrong_mask and len(set(chosen)) == best_size:
+                solutions.add(tuple(sorted(chosen)))
+            return
+        # The substitutes rule out no more than the members they replace
+        rest = sum_masks(eliminated[i] for i in members[len(chosen) + 1:])
+        for j in substitutes[members[len(chosen)]]:
+            if (union | eliminated[j] | rest) == wrong_mask:
+                expand(members, chosen + [j], union | eliminated[j])
+
+    for members in list(solutions):
+        expand(members, [], 0)
+
+    return {
+        'size': best_size,
+        'solutions': sorted(solutions),
+        'proven_minimal': proven_minimal,
+        'nodes': nodes,
+    }
+
+def canonical_form(expr):
+    """
+    A hashable structural key that ignores argument order, nesting of the same operator and
+    double negation, so e.g. A1 AND B2 and B2 AND A1 get the same key.
+    """
+    op = expr.op
+    if op == 'VAR':
+        return expr.obj
+    elif op == 'NOT':
+        inner = expr.args[0]
+        if inner.op == 'NOT':
+            return canonical_form(inner.args[0])
+        return ('NOT', canonical_form(inner))
+    elif op in ('AND', 'OR'):
+        keys = set()
+        for arg in expr.args:
+            key = canonical_form(arg)
+            if isinstance(key, tuple) and key[0] == op:
+                keys.update(key[1])
+            else:
+                keys.add(key)
+        return (op, frozenset(keys))
+    else:
+        raise ValueError(f"Unsupported expression type: {type(expr)} - {expr}")
+
+def is_tautology(expr):
+    """True when the statement holds in every assignment, so it can't rule anything out."""
+    if SOLVER_BACKEND == 'truth_table':
+        return statement_mask(expr) == all_assignments_mask
+    return not dpll_models([NOT(expr)], possible_assignments.category_vars, limit=1)
+
+# How generate_statements decides two statements are duplicates
+dedupe_keys = {
+    'text': str,                 # identical text only
+    'structure': canonical_form, # same structure up to ordering and double negation
+    'models': statement_mask,    # same meaning: True in exactly the same assignments
+}
+
+def generate_statements(actual_assignment, num_statements=50, max_propositions=4, rng=random,
+                        dedupe='models', drop_tautologies=True, drop_redundant=False, clue_index=None):
+    """
+    Generate up to num_statements unique conditional statements that are True under the actual assignment.
+    Duplicates are filtered out by dedupe_statements.
+
+    With a ClueIndex, statements are sampled from its precomputed meanings instead of being
+    generated recursively.
+    """
+    if clue_index is not None:
+        if clue_index.max_propositions != max_propositions:
+            raise ValueError(f"the clue index was built for max_propositions={clue_index.max_propositions}")
+        solution = possible_assignments.index_of(actual_assignment)
+        candidates = (clue_index.sample(solution, rng) for _ in range(num_statements))
+    else:
+        # Generate new expressions that evaluate to True with at most max_propositions propositions
+        candidates = (generate_random_expression(variables, actual_assignment, max_propositions, rng=rng)
+                      for _ in range(num_statements))
+    return dedupe_statements(candidates, dedupe, drop_tautologies, drop_redundant)
+
+def dedupe_statements(candidates, dedupe='models', drop_tautologies=True, drop_redundant=False):
+    """
+    Keep the first of each group of duplicate statements, in order.
+
+    `dedupe` picks the duplicate key from dedupe_keys. Tautologies carry no information and are dropped
+    unless drop_tautologies is False. With drop_redundant, a statement is also dropped when an earlier
+    statement already implies it (its models are a superset of that statement's models).
+    """
+    dedupe_key = dedupe_keys[dedupe]
+    seen = set()
+    kept_masks = []
+    conditional_statements = []
+    for expr in candidates:
+        # Check if this expression (or one with the same meaning) is already in our list
+        key = dedupe_key(expr)
+        if key in seen:
+            continue
+        if drop_tautologies and is_tautology(expr):
+            continue
+        if drop_redundant:
+            mask = statement_mask(expr)
+            if any(kept_mask | mask == mask for kept_mask in kept_masks):
                 continue
-                
-            # Store the combination being checked
-            combination_info = {
-                'size': len(subset),
-                'statements': subset,
-                'indices': [available_statements.index(stmt) + 1 for stmt in subset]
-            }
-            all_combinations_checked.append(combination_info)
-            
-            success, remaining = can_determine_truth_values(subset, possible_assignments)
-            if success:
-                determined_combinations.append((len(subset), subset, remaining[0]))
-    
-    if determined_combinations:
-        determined = True
-        print("\n" + "*"*60)
-        print("✅ SUCCESS! Found minimal combinations that can solve the murder case:")
-        print("*"*60)
-        
-        # Sort solutions by size to show smallest first
-        determined_combinations.sort(key=lambda x: x[0])
-        
-        # Show the successful combinations discovered
-        for i, (size, subset, assignment) in enumerate(determined_combinations, 1):
-            print(f"\n📋 Solution #{i}: {size} testimony/testimonies")
-            print("-"*60)
-            for stmt in subset:
-                stmt_idx = available_statements.index(stmt) + 1
-                natural_lang_stmt = expr_to_natural_language(stmt)
-                print(f"  Testimony #{stmt_idx}: {natural_lang_stmt}")
-            
-            print("\n🔍 The murderer has been caught!")
-            print_assignment(assignment)
-        
-        # Show all combinations that were checked
-        print(f"\nTotal testimony combinations analyzed: {len(all_combinations_checked)}")
-        print("\n📊 Sample of testimony combinations analyzed:")
-        print("-"*60)
-        for i, combo in enumerate(all_combinations_checked[:10], 1):
-            print(f"{i:2d}. Size {combo['size']}, Testimony indices: {combo['indices']}")
-        if len(all_combinations_checked) > 10:
-            print(f"... and {len(all_combinations_checked)-10} more combinations")
+            kept_masks.append(mask)
+        seen.add(key)
+        conditional_statements.append(expr)
+    return conditional_statements
+
+def generate_puzzle(seed=None, num_statements=50, max_propositions=4, dedupe='models', drop_redundant=False,
+                    clue_index=None):
+    """
+    Pick a hidden solution and generate the witness statements for it.
+    The same seed always gives the same puzzle; statements are revealed in `reveal_order`.
+    Statements come from clue_index when one is given (see generate_statements).
+    """
+    rng = random.Random(seed)
+    # Pick one assignment as our "actual" solution to the murder
+    actual_assignment = rng.choice(possible_assignments)
+    conditional_statements = generate_statements(actual_assignment, num_statements, max_propositions, rng,
+                                                 dedupe=dedupe, drop_redundant=drop_redundant, clue_index=clue_index)
+    # Shuffle the statements to reveal them in random order
+    reveal_order = list(conditional_statements)
+    rng.shuffle(reveal_order)
+    return {
+        'seed': seed,
+        'actual_assignment': actual_assignment,
+        'statements': conditional_statements,
+        'reveal_order': reveal_order,
+    }
+
+def plan_puzzle(seed=None, difficulty=3, num_statements=20, max_propositions=4, solve_round=None,
+                pool_attempts=500, max_tries=50, clue_index=None):
+    """
+    Build a puzzle whose smallest solving subset has exactly `difficulty` statements.
+
+    Each statement is treated as the set of wrong assignments it rules out. The planner first picks
+    `difficulty` statements that together rule out every wrong assignment, each ruling out something
+    the others don't. From each one it takes one such wrong assignment as an anchor, and only keeps
+    distractor statements that rule out at most one anchor. A solving subset then needs a separate
+    statement per anchor, so no subset smaller than `difficulty` can solve the case.
+
+    The last of those solving statements is revealed in round `solve_round` (the last round by
+    default), and the statements revealed before it can't solve the case on their own.
+    Raises ValueError when no such puzzle turns up within max_tries attempts.
+    """
+    solve_round = solve_round or num_statements
+    if not 1 <= difficulty <= solve_round <= num_statements:
+        raise ValueError("need 1 <= difficulty <= solve_round <= num_statements")
+
+    rng = random.Random(seed)
+    # Pick one assignment as our "actual" solution to the murder
+    actual_assignment = rng.choice(possible_assignments)
+    pool = generate_statements(actual_assignment, pool_attempts, max_propositions, rng, clue_index=clue_index)
+    wrong_mask = all_assignments_mask ^ (1 << possible_assignments.index_of(actual_assignment))
+    eliminated = [all_assignments_mask ^ statement_mask(expr) for expr in pool]
+
+    for _ in range(max_tries):
+        core = _plan_core(difficulty, eliminated, wrong_mask, rng)
+        if core is None:
+            continue
+
+        # Pick the anchors (one wrong assignment only each core statement rules out) that leave
+        # the most statements usable as distractors
+        private_bits = []
+        for i in core:
+            others = 0
+            for j in core:
+                if j != i:
+                    others |= eliminated[j]
+            private_bits.append(_mask_bits(eliminated[i] & ~others))
+        distractors = []
+        for _ in range(10):
+            anchor_mask = sum(rng.choice(bits) for bits in private_bits)
+            allowed = [i for i in range(len(pool))
+                       if i not in core and (eliminated[i] & anchor_mask).bit_count() <= 1]
+            if len(allowed) > len(distractors):
+                distractors = allowed
+        if len(distractors) < num_statements - difficulty:
+            continue
+
+        rng.shuffle(distractors)
+        order = _plan_reveal_order(core, distractors[:num_statements - difficulty], solve_round,
+                                   eliminated, wrong_mask, rng)
+        if order is None:
+            continue
+        reveal_order = [pool[i] for i in order]
+        return {
+            'seed': seed,
+            'actual_assignment': actual_assignment,
+            'statements': reveal_order,
+            'reveal_order': reveal_order,
+            'difficulty': difficulty,
+            'solution_statements': [pool[i] for i in core],
+        }
+    raise ValueError(f"could not plan a puzzle of difficulty {difficulty} with {num_statements} statements")
+
+def _mask_bits(mask):
+    """Split a bitmask into its single-bit parts."""
+    bits = []
+    while mask:
+        low_bit = mask & -mask
+        bits.append(low_bit)
+        mask ^= low_bit
+    return bits
+
+def _plan_core(difficulty, eliminated, wrong_mask, rng, node_budget=2000):
+    """
+    Randomly search for exactly `difficulty` statements that together rule out every wrong
+    assignment, where each statement rules out at least one assignment the others don't.
+    Returns their indices, or None when the node budget runs out first.
+    """
+    nodes = 0
+    def search(critical, uncovered):
+        nonlocal nodes
+        if not uncovered:
+            return list(critical) if len(critical) == difficulty else None
+        if len(critical) == difficulty:
+            return None
+
+        # Branch on the uncovered assignment with the fewest statements that rule it out
+        options = None
+        for bit in _mask_bits(uncovered):
+            bit_options = [i for i in range(len(eliminated)) if eliminated[i] & bit and i not in critical]
+            if options is None or len(bit_options) < len(options):
+                options = bit_options
+        if len(critical) == difficulty - 1:
+            options = [i for i in options if eliminated[i] & uncovered == uncovered]
+        rng.shuffle(options)
+
+        for i in options:
+            nodes += 1
+            if nodes > node_budget:
+                return None
+            extended = {}
+            for member, private in critical.items():
+                private &= ~eliminated[i]
+                if not private:
+                    break
+                extended[member] = private
+            else:
+                extended[i] = eliminated[i] & uncovered
+                found = search(extended, uncovered & ~eliminated[i])
+                if found is not None:
+                    return found
+        return None
+
+    return search({}, wrong_mask)
+
+def _plan_reveal_order(core, distractors, solve_round, eliminated, wrong_mask, rng, tries=20):
+    """
+    Order the statements so the last core statement comes in round solve_round and nothing
+    revealed before it already solves the case.
+    """
+    num_before = solve_round - len(core)
+    for _ in range(tries):
+        core_order = list(core)
+        rng.shuffle(core_order)
+        rng.shuffle(distractors)
+        before = core_order[:-1] + distractors[:num_before]
+        covered = 0
+        for i in before:
+            covered |= eliminated[i]
+        if covered == wrong_mask:
+            continue
+        rng.shuffle(before)
+        return before + [core_order[-1]] + distractors[num_before:]
+    return None
+
+def reveal_rounds(puzzle, stop_when_solved=True, stats=None):
+    """
+    Reveal the puzzle's statements one per round and yield what each round found.
+    Solutions are tuples of indices into the puzzle's reveal order.
+    Pass a DeductionStats as `stats` to record per-round counters and timings.
+    """
+    solver = IncrementalSolver(possible_assignments, stats)
+    for round_num, statement in enumerate(puzzle['reveal_order'], 1):
+        if stats is not None:
+            stats.start_round(round_num)
+        try:
+            solutions = solver.reveal(statement)
+            assignment = None
+            if solutions:
+                success, remaining = can_determine_truth_values(solver.statements, possible_assignments)
+                assignment = remaining[0]
+        finally:
+            if stats is not None:
+                stats.end_round()
+        yield {
+            'round': round_num,
+            'available_statements': solver.statements,
+            'solutions': solutions,
+            'assignment': assignment,
+            'subsets_checked': solver.subsets_checked,
+            'checked_sample': solver.checked_sample,
+        }
+        if solutions and stop_when_solved:
+            return
+
+def solve_puzzle(puzzle, stats=None, min_clue_budget=None):
+    """
+    Run the reveal loop on a puzzle and summarize it as plain, picklable data.
+    With min_clue_budget (in seconds), the summary also gets the fewest statements of the whole
+    puzzle that solve the case, from minimum_clue_sets.
+    """
+    summary = {
+        'seed': puzzle['seed'],
+        'solution': possible_assignments.true_variables(possible_assignments.index_of(puzzle['actual_assignment'])),
+        'num_statements': len(puzzle['statements']),
+        'solved_round': None,
+        'minimal_solutions': [],
+        'subsets_checked': 0,
+    }
+    for round_info in reveal_rounds(puzzle, stats=stats):
+        summary['subsets_checked'] += round_info['subsets_checked']
+        if round_info['solutions']:
+            summary['solved_round'] = round_info['round']
+            summary['minimal_solutions'] = [list(indices) for indices in round_info['solutions']]
+    if min_clue_budget is not None:
+        result = minimum_clue_sets(puzzle['statements'], puzzle['actual_assignment'], min_clue_budget)
+        summary['min_clues'] = result['size']
+        summary['min_clue_sets'] = [list(indices) for indices in result['solutions']]
+        summary['min_clues_proven'] = result['proven_minimal']
+    return summary
+
+def generate_and_solve(seed, num_statements=50, max_propositions=4, dedupe='models', drop_redundant=False,
+                       difficulty=None, clue_index=None, min_clue_budget=None, with_puzzle=False):
+    """
+    Generate the puzzle for one seed and solve it.
+    With a difficulty, the puzzle comes from plan_puzzle instead of random generation; when no
+    plan turns up for this seed, the result is {'seed': seed, 'error': ...} so a batch carries on.
+    With with_puzzle, the summary also carries the puzzle itself under 'puzzle' (e.g. to export it).
+    """
+    if difficulty is not None:
+        try:
+            puzzle = plan_puzzle(seed, difficulty, num_statements, max_propositions, clue_index=clue_index)
+        except ValueError as error:
+            return {'seed': seed, 'error': str(error)}
     else:
-        print("\n⏳ The case remains unsolved. We need more witness testimonies.")
-        print(f"\nTotal testimony combinations analyzed this round: {len(all_combinations_checked)}")
-        print("\n📊 Sample of testimony combinations analyzed this round:")
+        puzzle = generate_puzzle(seed, num_statements, max_propositions, dedupe, drop_redundant, clue_index)
+    summary = solve_puzzle(puzzle, min_clue_budget=min_clue_budget)
+    if with_puzzle:
+        summary['puzzle'] = puzzle
+    return summary
+
+def _init_worker(config, backend):
+    """Give a pool worker the parent's board and solver backend, whatever it got on import."""
+    global SOLVER_BACKEND
+    configure_board(*config)
+    SOLVER_BACKEND = backend
+
+def _run_chunk(function, items, options):
+    try:
+        return [function(item, **options) for item in items]
+    finally:
+        # A worker handles many chunks; don't let the caches grow with every puzzle it has seen.
+        # The board's variables are re-interned so they stay shared with the nodes built next.
+        statement_masks.clear()
+        natural_language_cache.clear()
+        expression_nodes.clear()
+        expression_nodes.update((('VAR', var.obj, ()), var) for var in variables.values())
+
+def run_in_pool(function, items, max_workers=None, chunk_size=16, **options):
+    """
+    Call function(item, **options) for every item across a process pool, yielding each result
+    as soon as its chunk finishes (so in completion order, not item order). Only a few chunks per
+    worker are in flight at once, so the items can be a lazy iterable of any length.
+    The function has to be importable by the workers, i.e. defined at module level. Workers play
+    on the caller's board (configure_board) with its SOLVER_BACKEND, however they are started.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = 2 * max_workers
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                             initargs=(board_config, SOLVER_BACKEND)) as executor:
+        pending = set()
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(items, chunk_size))
+                if not chunk:
+                    break
+                pending.add(executor.submit(_run_chunk, function, chunk, options))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+def run_batch(seeds, max_workers=None, chunk_size=16, **options):
+    """
+    Generate and solve a puzzle per seed across a process pool (see run_in_pool), yielding the
+    summaries in completion order. Extra keyword arguments are passed on to generate_and_solve.
+    """
+    return run_in_pool(generate_and_solve, seeds, max_workers, chunk_size, **options)
+
+def round_events(puzzle, stats=None):
+    """
+    One plain-data event per investigation round: the newly revealed clue, how many subsets were
+    checked, and any minimal solutions (as 0-based clue indices in reveal order).
+    """
+    for round_info in reveal_rounds(puzzle, stats=stats):
+        assignment = round_info['assignment']
+        yield {
+            'round': round_info['round'],
+            'clue': statement_text(round_info['available_statements'][-1]),
+            'subsets_checked': round_info['subsets_checked'],
+            'checked_sample': [list(indices) for indices in round_info['checked_sample']],
+            'solutions': [list(indices) for indices in round_info['solutions']],
+            'assignment': (possible_assignments.true_variables(possible_assignments.index_of(assignment))
+                           if assignment is not None else None),
+        }
+
+def write_events(events, stream, flush_every=64):
+    """Write events to a stream as JSON lines, in batches of flush_every lines."""
+    lines = []
+    for event in events:
+        lines.append(json.dumps(event))
+        if len(lines) >= flush_every:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            lines = []
+    if lines:
+        stream.write("\n".join(lines) + "\n")
+    stream.flush()
+
+def print_round_events(events):
+    """Human-readable consumer of round_events."""
+    determined = False
+    clues = []
+    for event in events:
+        clues.append(event['clue'])
+
+        print("\n" + "-"*60)
+        print(f"🔄 INVESTIGATION ROUND {event['round']}")
+        print("-"*60)
+        print(f"Available witness testimonies ({len(clues)}):")
+        for i, clue in enumerate(clues, 1):
+            print(f"{i:2d}. {clue}")
+
+        # Only subsets that include the newly revealed statement can be new solutions
+        print("\nAnalyzing witness testimonies to solve the case...")
+
+        subsets_checked = event['subsets_checked']
+        checked_sample = event['checked_sample']
+        if event['solutions']:
+            determined = True
+            print("\n" + "*"*60)
+            print("✅ SUCCESS! Found minimal combinations that can solve the murder case:")
+            print("*"*60)
+
+            # Show the successful combinations discovered, smallest first
+            assignment = possible_assignments.from_true_variables(event['assignment'])
+            for i, indices in enumerate(event['solutions'], 1):
+                print(f"\n📋 Solution #{i}: {len(indices)} testimony/testimonies")
+                print("-"*60)
+                for stmt_idx in indices:
+                    print(f"  Testimony #{stmt_idx + 1}: {clues[stmt_idx]}")
+
+                print("\n🔍 The murderer has been caught!")
+                print_assignment(assignment)
+
+            # Show all combinations that were checked
+            print(f"\nTotal testimony combinations analyzed: {subsets_checked}")
+            print("\n📊 Sample of testimony combinations analyzed:")
+        else:
+            print("\n⏳ The case remains unsolved. We need more witness testimonies.")
+            print(f"\nTotal testimony combinations analyzed this round: {subsets_checked}")
+            print("\n📊 Sample of testimony combinations analyzed this round:")
         print("-"*60)
-        for i, combo in enumerate(all_combinations_checked[:10], 1):
-            print(f"{i:2d}. Size {combo['size']}, Testimony indices: {combo['indices']}")
-        if len(all_combinations_checked) > 10:
-            print(f"... and {len(all_combinations_checked)-10} more combinations")
+        for i, indices in enumerate(checked_sample, 1):
+            print(f"{i:2d}. Size {len(indices)}, Testimony indices: {[idx + 1 for idx in indices]}")
+        if subsets_checked > len(checked_sample):
+            print(f"... and {subsets_checked - len(checked_sample)} more combinations")
+
+    if not determined:
+        print("\n❌ The case remains unsolved even after gathering all available testimonies.")
+
+def play(puzzle, csv_path='logical_statements.csv', stats=None, min_clue_budget=None):
+    """
+    Play a puzzle on the console: show the solution, the clues, and each investigation round.
+    With min_clue_budget (in seconds), finish with the fewest clues that would have solved it.
+    """
+    # Print the actual solution
+    print("="*60)
+    print("🔍 ACTUAL MURDER SOLUTION (HIDDEN FROM PLAYERS)")
+    print("="*60)
+    print_assignment(puzzle['actual_assignment'])
+    print("="*60)
+
+    # Print the conditional statements
+    print("="*60)
+    print("📜 WITNESS STATEMENTS AND CLUES")
+    print("="*60)
+    for i, expr in enumerate(puzzle['statements'], 1):
+        print(f"{i:2d}. {statement_text(expr)}")
+    print()
+
+    write_statements_csv(puzzle['statements'], csv_path)
+    print(f"✅ Logical statements have been written to '{csv_path}'")
+
+    # New approach: reveal statements one by one
+    print("="*60)
+    print("🔍 CLUE: THE LOGICAL DEDUCTION MURDER MYSTERY GAME 🕵️")
+    print("="*60)
+    print("You have a murder to solve! Statements from witnesses will be revealed one by one.")
+    print("In each round, we'll check if the currently available statements")
+    print("are enough to determine who committed the crime, where, and with what weapon.\n")
+
+    print_round_events(round_events(puzzle, stats))
+
+    if min_clue_budget is not None:
+        result = minimum_clue_sets(puzzle['statements'], puzzle['actual_assignment'], min_clue_budget)
+        if result['size'] is None:
+            print("\n🧮 No set of these statements solves the case.")
+        else:
+            proof = "proven minimal" if result['proven_minimal'] else "best found within the time budget"
+            print(f"\n🧮 Fewest statements that solve the case: {result['size']} ({proof})")
+            for indices in result['solutions'][:5]:
+                print(f"   Statements {', '.join(str(i + 1) for i in indices)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Clue: logical deduction murder mystery game")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the puzzle (or the first seed of a batch)")
+    parser.add_argument('--statements', type=int, default=50, help="number of statements to generate")
+    parser.add_argument('--max-propositions', type=int, default=4, help="maximum propositions per statement")
+    parser.add_argument('--dedupe', choices=sorted(dedupe_keys), default='models',
+                        help="how duplicate statements are detected")
+    parser.add_argument('--drop-redundant', action='store_true',
+                        help="also drop statements implied by an earlier statement")
+    parser.add_argument('--difficulty', type=int, default=None,
+                        help="plan the clues so the smallest solving set has exactly this many statements")
+    parser.add_argument('--quiet', action='store_true',
+                        help="only write one JSON event per investigation round to stdout")
+    parser.add_argument('--stats', metavar='PATH', default=None,
+                        help="write per-round deduction counters and timings to this JSON file")
+    parser.add_argument('--profile-round', type=int, default=None,
+                        help="run this round under cProfile and print the report to stderr")
+    parser.add_argument('--batch', type=int, default=None,
+                        help="generate and solve this many seeded puzzles, printing one JSON line each")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for --batch")
+    parser.add_argument('--min-clue-budget', type=float, metavar='SECONDS', default=None,
+                        help="also find the fewest statements that solve each puzzle, searching this long at most")
+    parser.add_argument('--export', metavar='DIR', default=None,
+                        help="also append the statements to this columnar statement store")
+    parser.add_argument('--clue-index', metavar='PATH', default=None,
+                        help="sample statements from this clue index instead of generating them")
+    parser.add_argument('--build-clue-index', metavar='PATH', default=None,
+                        help="write the clue index for --max-propositions to this file and exit")
+    args = parser.parse_args()
+
+    if args.build_clue_index:
+        entries = build_clue_index(args.build_clue_index, args.max_propositions)
+        print(f"Wrote {entries} distinct clues to '{args.build_clue_index}'")
+        return
+    clue_index = ClueIndex(args.clue_index) if args.clue_index else None
+    store = StatementStore(args.export) if args.export else None
+
+    if args.difficulty is not None and not 1 <= args.difficulty <= args.statements:
+        parser.error("--difficulty must be between 1 and --statements")
+
+    if args.batch is None:
+        if store and args.seed is None:
+            # Exported statements are identified by their puzzle's seed, so pick one
+            args.seed = random.randrange(2**31)
+        if args.difficulty is not None:
+            try:
+                puzzle = plan_puzzle(args.seed, args.difficulty, args.statements, args.max_propositions,
+                                     clue_index=clue_index)
+            except ValueError as error:
+                parser.error(f"{error} for seed {args.seed}; try another --seed or --statements")
+        else:
+            puzzle = generate_puzzle(args.seed, args.statements, args.max_propositions, args.dedupe, args.drop_redundant,
+                                     clue_index)
+        stats = DeductionStats(args.profile_round) if args.stats or args.profile_round else None
+        if args.quiet:
+            write_events(round_events(puzzle, stats), sys.stdout)
+        else:
+            play(puzzle, stats=stats, min_clue_budget=args.min_clue_budget)
+        if store:
+            store.append_puzzle(puzzle)
+            store.close()
+        if args.stats:
+            stats.write_json(args.stats)
+        if args.profile_round:
+            stats.print_profile()
+        return
+
+    first_seed = args.seed or 0
+    seeds = range(first_seed, first_seed + args.batch)
+    for summary in run_batch(seeds, args.workers, num_statements=args.statements,
+                             max_propositions=args.max_propositions, dedupe=args.dedupe,
+                             drop_redundant=args.drop_redundant, difficulty=args.difficulty, clue_index=clue_index,
+                             min_clue_budget=args.min_clue_budget, with_puzzle=store is not None):
+        if store and 'puzzle' in summary:
+            store.append_puzzle(summary.pop('puzzle'))
+        print(json.dumps(summary))
+    if store:
+        store.close()
 
-if not determined:
-    print("\n❌ The case remains unsolved even after gathering all available testimonies.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()